@@ -16,6 +16,36 @@ export default function HomePage() {
 
   const fetchStats = async () => {
     try {
+      // Headline numbers from the static leaderboard pointer (CDN), then the stats row
+      const pointer = await fetch('/leaderboard/latest.json')
+        .then(r => (r.ok ? r.json() : null))
+        .catch(() => null);
+
+      if (pointer?.total_participants !== undefined) {
+        setStats({
+          totalParticipants: pointer.total_participants,
+          totalBadges: pointer.total_badges,
+          activeNow: pointer.active_participants
+        });
+        return;
+      }
+
+      // Precomputed by the scraper at the end of each run
+      const { data: published } = await supabase
+        .from('leaderboard_stats')
+        .select('stats')
+        .eq('id', 1)
+        .maybeSingle();
+
+      if (published?.stats) {
+        setStats({
+          totalParticipants: published.stats.total_participants,
+          totalBadges: published.stats.total_badges,
+          activeNow: published.stats.active_participants
+        });
+        return;
+      }
+
       const { data: participants, error } = await supabase
         .from('participants')
         .select('total_badges');
@@ -17,15 +17,46 @@ export default function LeaderboardPage() {
   const [showFilters, setShowFilters] = useState(false);
   const [lastUpdated, setLastUpdated] = useState(null);
 
+  // Static, content-hashed leaderboard files published with each scraper run (served from the CDN)
+  const fetchStaticLeaderboard = async () => {
+    try {
+      const pointer = await fetch('/leaderboard/latest.json').then(r => (r.ok ? r.json() : null));
+      if (!pointer?.full) return null;
+      const bundle = await fetch(`/leaderboard/${pointer.full}`).then(r => (r.ok ? r.json() : null));
+      return bundle?.rows.map(row => {
+        const participant = Object.fromEntries(bundle.fields.map((field, i) => [field, row[i]]));
+        return { ...participant, id: participant.profile_url };
+      });
+    } catch (error) {
+      console.error('Error fetching static leaderboard:', error);
+      return null;
+    }
+  };
+
   const fetchLeaderboard = async () => {
     try {
       setLoading(true);
-      const { data, error } = await supabase
-        .from('participants')
-        .select('*')
-        .order('rank', { ascending: true });
+      let data = await fetchStaticLeaderboard();
 
-      if (error) throw error;
+      if (!data) {
+        // Pre-ranked projection published by the scraper; fall back to the full table
+        const { data: published } = await supabase
+          .from('leaderboard_stats')
+          .select('leaderboard')
+          .eq('id', 1)
+          .maybeSingle();
+        data = published?.leaderboard;
+      }
+
+      if (!data) {
+        const response = await supabase
+          .from('participants')
+          .select('*')
+          .order('rank', { ascending: true });
+
+        if (response.error) throw response.error;
+        data = response.data;
+      }
       setParticipants(data || []);
       setFilteredParticipants(data || []);
       setLastUpdated(new Date());
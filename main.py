@@ -1,14 +1,29 @@
 import os
 import logging
-import json
-import pandas as pd
+import argparse
+from typing import List, Dict, Tuple, Optional
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime, timezone
-from scrapper.fetch_excel import download_excel_to_df
-from scrapper.scrapper import scrape_profile_badges_for_list
-from scrapper.processor import build_and_save_csvs, compute_summary
+from itertools import chain
+from scrapper.scrapper import iter_profile_badges, rate_summary, timing_summary
+from scrapper.profile_cache import ProfileCache
+from scrapper.fingerprints import FingerprintStore
+from scrapper.journal import RunJournal
+from scrapper.participants import load_participants
+from scrapper.history import HistoryStore
+from scrapper.serialization import write_json, find_json, read_json
+from scrapper.scheduler import ScrapeSchedule
+from scrapper.archive import HtmlArchive, ARCHIVE_HTML
+from scrapper.sharding import parse_shard, select_shard, write_shard, load_shards, remove_shards
+from scrapper.static_bundle import build_static_bundle
+from scrapper.config import get_setting
+from scrapper.processor import build_and_save_csvs, build_leaderboard_json
 from scrapper.supbase_client import SupabaseClient
+from scrapper.pipeline import run_pipeline, JsonlSink, CsvAppendSink, SupabaseBatchSink
+
+# Before the first log call, which would otherwise set up the root logger at WARNING
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 # Load environment variables from config/.env if it exists (local development)
 env_path = Path("config/.env")
@@ -18,14 +33,28 @@ if env_path.exists():
 else:
     logging.info("No config/.env found, using environment variables")
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-
 DATA_DIR = Path(os.getenv("DATA_DIR", "./data"))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 DRIVE_LINK = os.getenv("DRIVE_XLSX_LINK")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+INCREMENTAL = os.getenv("INCREMENTAL_RUN", "false").lower() in ("1", "true", "yes")
+STREAM = os.getenv("STREAM_RESULTS", "false").lower() in ("1", "true", "yes")
+# Where streaming runs write results as they arrive
+PARTIAL_DIR = DATA_DIR / "partial"
+# Last registration sheet download and the participants parsed from it
+SHEET_CACHE_DIR = DATA_DIR / "sheet"
+# Partial results written by --shard runs and combined by --merge-shards
+SHARD_DIR = DATA_DIR / "shards"
+# Run journals; an interrupted run younger than RESUME_MAX_AGE_HOURS is resumed
+JOURNAL_DIR = DATA_DIR / "runs"
+RESUME = os.getenv("RESUME_RUNS", "true").lower() in ("1", "true", "yes")
+RESUME_MAX_AGE_HOURS = float(os.getenv("RESUME_MAX_AGE_HOURS", "12"))
+# Only scrape profiles the schedule says are due; the rest keep last run's results
+DUE_ONLY = os.getenv("DUE_ONLY", "false").lower() in ("1", "true", "yes")
+STATIC_BUNDLE = str(os.getenv("STATIC_BUNDLE", get_setting("data", "static_bundle", True))).lower() in ("1", "true", "yes")
+USE_PROFILE_CACHE = str(os.getenv("USE_PROFILE_CACHE", get_setting("scraper", "use_profile_cache", True))).lower() in ("1", "true", "yes")
 
 if not DRIVE_LINK:
     logging.error("Please set DRIVE_XLSX_LINK environment variable or in config/.env")
@@ -34,138 +63,237 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     logging.error("Please set SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables or in config/.env")
     raise SystemExit(1)
 
-def main():
-    run_start = datetime.now(timezone.utc)
-    logging.info("Starting Study Jam scraper run at %s", run_start.isoformat())
+def write_json_outputs(results: List[Dict], timestamped: bool = True) -> Tuple[Dict, Path]:
+    """
+    Write the latest leaderboard JSON file, plus a timestamped copy unless the run is
+    recorded in the Parquet history instead. Returns (json_data, path of the file written).
+    """
+    json_data = build_leaderboard_json(results)
     
-    # 1. Download Excel & read into DataFrame
-    df = download_excel_to_df(DRIVE_LINK)
-    logging.info("Excel downloaded: %d rows", len(df))
-
-    # 2. Ensure column name for profile url (your sheet header)
-    # Look for column containing URLs (cloudskillsboost.google or public_profiles in the name)
-    profile_col_candidates = []
+    # Save complete JSON (format and compression come from JSON_FORMAT / JSON_COMPRESSION)
+    json_path = None
+    if timestamped:
+        json_path = write_json(json_data, DATA_DIR / f"leaderboard_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}")
+        logging.info("Saved JSON: %s", json_path)
     
-    # First try: look for columns with "cloudskillsboost" or explicit URL markers
-    for col in df.columns:
-        col_lower = col.lower()
-        if "cloudskillsboost" in col_lower or "public_profiles" in col_lower or "profile url" in col_lower:
-            profile_col_candidates.append(col)
-    
-    # Second try: look for columns containing actual URLs in the data
-    if not profile_col_candidates:
-        logging.info("Trying to detect profile URL column from data content...")
-        for col in df.columns:
-            # Check if this column contains URLs
-            sample_values = df[col].dropna().head(5)
-            url_count = sum(1 for val in sample_values if isinstance(val, str) and "cloudskillsboost.google" in val.lower())
-            if url_count > 0:
-                profile_col_candidates.append(col)
-                logging.info("Found column '%s' with %d URLs in sample", col, url_count)
+    # Save latest JSON (overwrite)
+    latest_json_path = write_json(json_data, DATA_DIR / "leaderboard_latest")
+    logging.info("Saved latest JSON: %s", latest_json_path)
     
-    if not profile_col_candidates:
-        # fall back to last column
-        profile_col = df.columns[-1] if len(df.columns) >= 1 else df.columns[0]
-        logging.warning("Could not detect profile url column automatically. Using fallback column: %s", profile_col)
-    else:
-        profile_col = profile_col_candidates[0]
-        logging.info("Detected profile URL column: %s", profile_col)
+    return json_data, json_path or latest_json_path
 
-    participants = []
-    for idx, row in df.iterrows():
-        profile_url = str(row.get(profile_col, "")).strip()
-        
-        # Try different variations of name column
-        name_cols = ["Your Full Name", "Full Name", "Your full name", "Name"]
-        name = ""
-        for col in name_cols:
-            if col in row and pd.notna(row[col]):
-                name = str(row[col]).strip()
-                break
-        
-        # Try different variations of email column - look for the email-specific one
-        email_cols = [col for col in df.columns if "email address" in col.lower() and "skills boost" in col.lower()]
-        if not email_cols:
-            email_cols = ["Email", "Email Address", "email"]
-        
-        email = ""
-        for col in email_cols:
-            if col in row and pd.notna(row[col]):
-                email = str(row[col]).strip()
-                break
-        
-        # Validate profile URL
-        if profile_url and profile_url.startswith("http") and "cloudskillsboost.google" in profile_url.lower():
-            participants.append({
-                "row_index": int(idx),
-                "name": name or "Unknown",
-                "email": email or "",
-                "profile_url": profile_url
-            })
-        elif profile_url and profile_url.startswith("http"):
-            logging.warning("Skipping row %d: URL doesn't look like Cloud Skills Boost: %s", idx, profile_url[:50])
+def load_latest_results() -> Dict[str, Dict]:
+    """
+    Participants from the last leaderboard_latest JSON, keyed by profile URL
+    """
+    latest = find_json(DATA_DIR / "leaderboard_latest")
+    if latest is None:
+        return {}
+    try:
+        return {p.get("profile_url"): p for p in read_json(latest).get("participants", [])}
+    except Exception as e:
+        logging.warning("Could not load previous results from %s: %s", latest, e)
+        return {}
 
-    logging.info("Found %d valid participants with Cloud Skills Boost profile URLs", len(participants))
+def keep_previous_badges(results: List[Dict]) -> List[Dict]:
+    """
+    Give participants whose profile couldn't be fetched their badges from the last
+    leaderboard_latest JSON. The error stays on the result, so it still isn't pushed,
+    fingerprinted or journaled as done.
+    """
+    failed = [i for i, r in enumerate(results) if r.get("error")]
+    if not failed:
+        return results
+    previous = load_latest_results()
+    kept = 0
+    for i in failed:
+        last = previous.get(results[i].get("profile_url"))
+        if last is not None:
+            results[i] = {**results[i], "badges": last.get("badges", [])}
+            kept += 1
+    logging.warning("%d profiles could not be scraped; %d keep their badges from the last run", len(failed), kept)
+    return results
 
-    # 3. Scrape badges for each participant
-    results = scrape_profile_badges_for_list(participants)
+def scrape_shard(participants: List[Dict], shard: Tuple[int, int], due_only: bool, run_start: datetime) -> Path:
+    """
+    Scrape one shard of the participants into SHARD_DIR; CSVs, JSON and the Supabase
+    sync are left to the --merge-shards run
+    """
+    index, count = shard
+    mine = select_shard(participants, index, count)
+    if due_only:
+        schedule = ScrapeSchedule.from_data_dir(DATA_DIR)
+        mine = [mine[i] for i in schedule.due(mine, run_start)]
+    logging.info("Shard %d/%d: scraping %d of %d participants", index, count, len(mine), len(participants))
 
-    # 4. Save CSVs locally
-    summary_df, detailed_df = build_and_save_csvs(results, DATA_DIR)
+    profile_cache = ProfileCache.from_data_dir(DATA_DIR) if USE_PROFILE_CACHE else None
+    results = [None] * len(mine)
+    for i, result in iter_profile_badges(mine, cache=profile_cache):
+        results[i] = result
+    # The merge folds these into data/profile_cache.json, next to the badges they describe
+    cache_entries = {}
+    if profile_cache is not None:
+        cache_entries = {p["profile_url"]: profile_cache.entries[p["profile_url"]]
+                         for p in mine if p["profile_url"] in profile_cache.entries}
+    path = write_shard(SHARD_DIR, index, count, results, cache_entries)
+    logging.info("Saved shard %d/%d: %s", index, count, path)
+    return path
 
-    # 5. Save JSON files locally
-    json_data = {
-        "scraped_at": datetime.now(timezone.utc).isoformat(),
-        "total_participants": len(results),
-        "participants": []
-    }
+def main(incremental: bool = False, stream: bool = False, resume: bool = True, due_only: bool = False,
+         shard: Optional[Tuple[int, int]] = None, merge_shards: bool = False):
+    run_start = datetime.now(timezone.utc)
+    logging.info("Starting Study Jam scraper run at %s%s%s%s%s", run_start.isoformat(),
+                 " (incremental)" if incremental else "", " (streaming)" if stream else "",
+                 " (due profiles only)" if due_only else "",
+                 f" (shard {shard[0]}/{shard[1]})" if shard else " (merging shards)" if merge_shards else "")
     
-    MAX_BADGES = 19
-    for r in results:
-        badges = r.get("badges", [])
-        # Cap badges at 19
-        if len(badges) > MAX_BADGES:
-            badges = badges[:MAX_BADGES]
-        
-        json_data["participants"].append({
-            "name": r.get("name"),
-            "email": r.get("email"),
-            "profile_url": r.get("profile_url"),
-            "total_badges": len(badges),
-            "badges": badges,
-            "error": r.get("error")
-        })
+    # 1-2. Download the registration sheet (cached in data/sheet) and build the participant
+    # list from its profile URL/name/email columns; an unchanged sheet isn't parsed again
+    participants = load_participants(DRIVE_LINK, SHEET_CACHE_DIR)
+
+    logging.info("Found %d valid participants with Cloud Skills Boost profile URLs", len(participants))
     
-    # Save complete JSON
-    json_path = DATA_DIR / f"leaderboard_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
-    logging.info("Saved JSON: %s", json_path)
+    if shard:
+        scrape_shard(participants, shard, due_only, run_start)
+        return
+    # Fails before anything is written if a shard is missing
+    shard_results, shard_cache = load_shards(SHARD_DIR) if merge_shards else ({}, {})
+
+    # 3. Scrape badges for each participant (unchanged profiles reuse last run's badges)
+    profile_cache = ProfileCache.from_data_dir(DATA_DIR) if USE_PROFILE_CACHE else None
+    archive = HtmlArchive.from_data_dir(DATA_DIR) if ARCHIVE_HTML else None
+    fingerprints = FingerprintStore.from_data_dir(DATA_DIR)
+    schedule = ScrapeSchedule.from_data_dir(DATA_DIR)
+    supa = SupabaseClient(SUPABASE_URL, SUPABASE_KEY)
     
-    # Save latest JSON (overwrite)
-    latest_json_path = DATA_DIR / "leaderboard_latest.json"
-    with open(latest_json_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
-    logging.info("Saved latest JSON: %s", latest_json_path)
+    # Every scraped profile is journaled, so an interrupted run can pick up where it stopped
+    journal = RunJournal.resume_latest(JOURNAL_DIR, RESUME_MAX_AGE_HOURS) if resume else None
+    if journal is not None:
+        done = journal.completed_results()
+        logging.info("Resuming run %s: %d of %d profiles already scraped", journal.run_key,
+                     sum(1 for p in participants if p["profile_url"] in done), len(participants))
+    else:
+        journal = RunJournal.start(JOURNAL_DIR, len(participants))
+        done = {}
+    if merge_shards:
+        # Shard results count as already scraped in this run
+        done = {**shard_results, **done}
+        if profile_cache is not None:
+            profile_cache.entries.update(shard_cache)
+        logging.info("Merging shards: %d of %d participants scraped by shard runs",
+                     sum(1 for p in participants if p["profile_url"] in shard_results), len(participants))
+    
+    run_id = journal.supabase_run_id
+    if run_id is None:
+        run_id = supa.create_run(len(participants))
+        journal.set_supabase_run(run_id)
+    
+    todo = [i for i, p in enumerate(participants) if p["profile_url"] not in done]
+    carried = {}
+    if due_only or merge_shards:
+        # Profiles that aren't due keep last run's result; anything without one is scraped anyway.
+        # A merge carries over whatever no shard scraped (not due there, or added to the sheet since).
+        due = set() if merge_shards else set(schedule.due(participants, run_start))
+        previous = load_latest_results()
+        carried = {i: previous[participants[i]["profile_url"]] for i in todo
+                   if i not in due and participants[i]["profile_url"] in previous}
+        todo = [i for i in todo if i not in carried]
+        logging.info("Scraping %d of %d profiles, %d kept from the last run", len(todo), len(participants), len(carried))
+    scraped_urls = {participants[i]["profile_url"] for i in todo} | set(done)
+    resumed = ((i, done[p["profile_url"]]) for i, p in enumerate(participants) if p["profile_url"] in done)
+    scraped = ((todo[j], r) for j, r in iter_profile_badges([participants[i] for i in todo], cache=profile_cache,
+                                                                    archive=archive))
+    items = chain(resumed, carried.items(), journal.record(scraped))
+    
+    supabase_sink = None
+    if stream:
+        # Results go to the partial JSONL/CSV files and Supabase as each profile completes
+        supabase_sink = SupabaseBatchSink(supa, fingerprints=fingerprints if incremental else None)
+        sinks = [
+            JsonlSink(PARTIAL_DIR / "results.jsonl"),
+            CsvAppendSink(PARTIAL_DIR / "leaderboard_detailed.csv"),
+            supabase_sink
+        ]
+        results = run_pipeline(items, len(participants), sinks)
+    else:
+        results = [None] * len(participants)
+        for i, result in items:
+            results[i] = result
+    results = keep_previous_badges(results)
+
+    # In incremental mode only participants whose badges changed since the last run are written.
+    # Failed scrapes are never pushed: their badges are last run's, not what the profile has now.
+    # Worked out from the results even when streaming, so a failed Supabase push doesn't
+    # also skip the local outputs.
+    changed = fingerprints.changed(results) if incremental else [r for r in results if not r.get("error")]
+    if incremental:
+        logging.info("Incremental run: %d of %d participants changed since last run", len(changed), len(results))
+    
+    json_path = None
+    if changed:
+        # 4. Save CSVs locally (ranks depend on everyone, so the files are always rebuilt in full)
+        summary_df, detailed_df = build_and_save_csvs(results, DATA_DIR)
+        if STATIC_BUNDLE:
+            # Content-hashed copy of the ranking the frontend serves from the CDN
+            build_static_bundle(summary_df)
+
+        # 5. Save JSON files locally; past runs go to the Parquet history when it's enabled
+        history = HistoryStore.from_data_dir(DATA_DIR)
+        if history is not None:
+            history.append(journal.run_key, results)
+        json_data, json_path = write_json_outputs(results, timestamped=history is None)
+    else:
+        logging.info("No participant changed; keeping existing CSV, JSON and snapshot")
+    
+    # Cache entries refer to the badges in leaderboard_latest.json, so save them together
+    if profile_cache is not None:
+        profile_cache.save()
+    if archive is not None:
+        archive.save(journal.run_key)
+    schedule.prune(participants)
+    schedule.update(results, scraped_urls, run_start)
+    schedule.save()
 
     # 6. Push to Supabase
-    supa = SupabaseClient(SUPABASE_URL, SUPABASE_KEY)
     logging.info("Pushing to Supabase")
     
-    run_id = None
     try:
-        # Create run record
-        run_id = supa.create_run(len(participants))
-        
-        # Upsert participants and badges
-        success_count, failure_count = supa.upsert_participants_and_badges(results)
+        success_count, failure_count = 0, 0
+        badge_sync = supa.last_badge_sync
+        pushed = []
+        if supabase_sink is not None:
+            # Participants and badges were already pushed while scraping
+            success_count, failure_count = supabase_sink.success_count, supabase_sink.failure_count
+            badge_sync = supabase_sink.badge_sync
+            pushed = supabase_sink.pushed
+        elif changed:
+            # Upsert participants and badges
+            success_count, failure_count = supa.upsert_participants_and_badges(changed)
+            badge_sync = supa.last_badge_sync
+            pushed = changed
         
-        # Save leaderboard snapshot
-        supa.save_leaderboard_snapshot(json_data)
+        if changed:
+            # Save leaderboard snapshot and the precomputed stats the frontend reads
+            supa.save_leaderboard_snapshot(json_data)
+            supa.publish_leaderboard_stats()
         
         # Complete run record
         run_finish = datetime.now(timezone.utc)
-        supa.complete_run(run_id, success_count, failure_count, f"Completed successfully in {(run_finish - run_start).seconds}s")
+        run_log = (f"Completed successfully in {(run_finish - run_start).seconds}s; "
+                   f"{len(pushed)} of {len(results)} participants pushed; "
+                   f"badges +{badge_sync.get('added', 0)} -{badge_sync.get('removed', 0)}, "
+                   f"{badge_sync.get('unchanged', 0)} participants unchanged")
+        rates = rate_summary()
+        if rates:
+            run_log += f"; {rates}"
+        run_log += f"; {timing_summary()}"
+        supa.complete_run(run_id, success_count, failure_count, run_log)
+        
+        # Only remember fingerprints once the changes are safely in the database,
+        # otherwise the next incremental run would skip them
+        if failure_count == 0:
+            fingerprints.update(pushed)
+            fingerprints.save()
         
         logging.info("Scraper run completed successfully.")
         logging.info("Success: %d, Failures: %d", success_count, failure_count)
@@ -174,9 +302,35 @@ def main():
         if run_id:
             supa.complete_run(run_id, 0, len(participants), f"Failed: {str(e)}")
     
-    logging.info("Summary saved: %s", DATA_DIR / "leaderboard_summary.csv")
-    logging.info("Detailed saved: %s", DATA_DIR / "leaderboard_detailed.csv")
-    logging.info("JSON saved: %s", json_path)
+    journal.complete()
+    if merge_shards:
+        remove_shards(SHARD_DIR)
+    
+    if json_path:
+        logging.info("Summary saved: %s", DATA_DIR / "leaderboard_summary.csv")
+        logging.info("Detailed saved: %s", DATA_DIR / "leaderboard_detailed.csv")
+        logging.info("JSON saved: %s", json_path)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape Cloud Skills Boost badges and update the Study Jam leaderboard")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL,
+                        help="Only write participants whose badges changed since the last run (env INCREMENTAL_RUN)")
+    parser.add_argument("--stream", action="store_true", default=STREAM,
+                        help="Write results to data/partial and Supabase while scraping (env STREAM_RESULTS)")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", default=RESUME,
+                        help="Start from scratch even if the last run was interrupted (env RESUME_RUNS=false)")
+    parser.add_argument("--due-only", action="store_true", default=DUE_ONLY,
+                        help="Only scrape profiles due per data/schedule.json, reuse the rest (env DUE_ONLY)")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="Only scrape shard i of N (by hashed profile URL) into data/shards; combine with --merge-shards")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="Combine the data/shards results, then write outputs and sync Supabase once")
+    args = parser.parse_args()
+    if args.shard and args.merge_shards:
+        parser.error("--shard and --merge-shards are separate runs")
+    return args
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(incremental=args.incremental, stream=args.stream, resume=args.resume, due_only=args.due_only,
+         shard=args.shard, merge_shards=args.merge_shards)
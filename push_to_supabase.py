@@ -4,10 +4,9 @@ Quick script to push existing CSV data to Supabase
 from dotenv import load_dotenv
 from pathlib import Path
 import os
-import json
 import logging
-from datetime import datetime, timezone
 from scrapper.supbase_client import SupabaseClient
+from scrapper.serialization import find_json, read_json
 
 # Load environment variables from config/.env if it exists
 env_path = Path("config/.env")
@@ -23,15 +22,14 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
 def main():
-    # Load the latest JSON data
-    json_path = DATA_DIR / "leaderboard_latest.json"
+    # Load the latest JSON data (any format or compression the scraper writes)
+    json_path = find_json(DATA_DIR / "leaderboard_latest")
     
-    if not json_path.exists():
+    if json_path is None:
         logging.error("No JSON file found. Run the scraper first!")
         return
     
-    with open(json_path, 'r', encoding='utf-8') as f:
-        json_data = json.load(f)
+    json_data = read_json(json_path)
     
     logging.info("Loaded data for %d participants", len(json_data.get("participants", [])))
     
@@ -51,6 +49,7 @@ def main():
         
         # Save leaderboard snapshot
         supa.save_leaderboard_snapshot(json_data)
+        supa.publish_leaderboard_stats()
         
         # Complete run record
         supa.complete_run(run_id, success_count, failure_count, "Pushed from existing CSV data")
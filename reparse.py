@@ -0,0 +1,90 @@
+"""
+Rebuild the leaderboard from archived profile HTML (data/archive) without any network
+calls, e.g. to apply a parser fix to every participant at once. Rewrites the CSVs,
+leaderboard_latest JSON and the static bundle; run push_to_supabase.py afterwards to
+sync the database.
+
+Participants are the ones in the current leaderboard_latest JSON; anyone without an
+archived page keeps their current badges.
+
+Usage: python reparse.py [--run RUN_KEY] [--backend auto|selectolax|lxml|bs4]
+"""
+import os
+import logging
+import argparse
+from functools import partial
+from pathlib import Path
+from typing import List, Dict, Optional
+from scrapper.archive import HtmlArchive
+from scrapper.badge_parser import resolve_backend
+from scrapper.config import get_setting
+from scrapper.fingerprints import fingerprint
+from scrapper.parse_pool import ParsePool
+from scrapper.processor import build_and_save_csvs, build_leaderboard_json
+from scrapper.scrapper import parse_badges_from_html, PARSE_WORKERS, PARSE_CHUNK_SIZE
+from scrapper.serialization import find_json, read_json, write_json
+from scrapper.static_bundle import build_static_bundle
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+DATA_DIR = Path(os.getenv("DATA_DIR", "./data"))
+STATIC_BUNDLE = str(os.getenv("STATIC_BUNDLE", get_setting("data", "static_bundle", True))).lower() in ("1", "true", "yes")
+
+def reparse(run_key: Optional[str] = None, backend: Optional[str] = None) -> List[Dict]:
+    parse = partial(parse_badges_from_html, backend=resolve_backend(backend)) if backend else parse_badges_from_html
+
+    latest = find_json(DATA_DIR / "leaderboard_latest")
+    if latest is None:
+        logging.error("No leaderboard_latest JSON in %s; it lists the participants to rebuild", DATA_DIR)
+        return []
+    previous = read_json(latest).get("participants", [])
+
+    archive = HtmlArchive.from_data_dir(DATA_DIR)
+    manifest = archive.run_manifest(run_key)
+    pages = {}
+    for i, p in enumerate(previous):
+        digest = manifest.get(p.get("profile_url"))
+        html = archive.get(digest) if digest else None
+        if html is not None:
+            pages[i] = html
+    logging.info("Re-parsing %d of %d participants from %s", len(pages), len(previous), archive.root)
+
+    results = [dict(p) for p in previous]
+    if PARSE_WORKERS > 0 and len(pages) > PARSE_CHUNK_SIZE:
+        with ParsePool(PARSE_WORKERS, PARSE_CHUNK_SIZE, parse) as parser:
+            for i, html in pages.items():
+                parser.add(i, html)
+            parser.flush()
+            parsed = [page for future in list(parser.futures) for page in parser.collect(future)]
+    else:
+        parsed = []
+        for i, html in pages.items():
+            try:
+                parsed.append((i, parse(html), None, 0.0))
+            except Exception as e:
+                parsed.append((i, None, str(e), 0.0))
+    changed = 0
+    for i, badges, error, _ in parsed:
+        result = {**results[i], "badges": badges or [], "error": error}
+        changed += fingerprint(result) != fingerprint(results[i])
+        results[i] = result
+    logging.info("Badges changed for %d participants", changed)
+
+    summary_df, _ = build_and_save_csvs(results, DATA_DIR)
+    if STATIC_BUNDLE:
+        build_static_bundle(summary_df)
+    path = write_json(build_leaderboard_json(results), DATA_DIR / "leaderboard_latest")
+    logging.info("Saved latest JSON: %s", path)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the leaderboard outputs from archived profile HTML")
+    parser.add_argument("--run", dest="run_key", help="Use the pages fetched in this run (data/archive/runs) "
+                        "instead of the newest page of every profile")
+    parser.add_argument("--backend", choices=["auto", "selectolax", "lxml", "bs4"],
+                        help="Parser backend (env PARSER_BACKEND)")
+    args = parser.parse_args()
+    reparse(args.run_key, args.backend)
+
+if __name__ == "__main__":
+    main()
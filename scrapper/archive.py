@@ -0,0 +1,114 @@
+import os
+import gzip
+import json
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from scrapper.config import get_setting
+from scrapper.profile_cache import content_hash
+
+# Raw profile HTML, kept so a parser fix can be applied offline (reparse.py):
+#   <root>/objects/<2 hex>/<hash>.html.gz   gzipped page, addressed by profile_cache.content_hash,
+#                                           so a page that didn't change is stored once
+#   <root>/index.json                       {profile_url: {"hash", "fetched_at"}}, newest page per profile
+#   <root>/runs/<run key>.json              {profile_url: hash} for the pages fetched in that run
+ARCHIVE_HTML = str(os.getenv("ARCHIVE_HTML", get_setting("data", "archive_html", False))).lower() in ("1", "true", "yes")
+ARCHIVE_KEEP_RUNS = int(os.getenv("ARCHIVE_KEEP_RUNS", get_setting("data", "archive_keep_runs", 30)))
+ARCHIVE_DIRNAME = "archive"
+INDEX_FILENAME = "index.json"
+
+class HtmlArchive:
+    """
+    Content-addressed store of fetched profile pages. put() is called from the fetch
+    threads; save() writes the index and this run's manifest and drops pages no kept
+    run refers to.
+    """
+
+    def __init__(self, root: Path, keep_runs: int = ARCHIVE_KEEP_RUNS):
+        self.root = root
+        self.keep_runs = keep_runs
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.fetched: Dict[str, str] = {}
+        self.stored = 0
+        index_path = root / INDEX_FILENAME
+        if index_path.exists():
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                logging.warning("Ignoring unreadable HTML archive index %s: %s", index_path, e)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path) -> "HtmlArchive":
+        return cls(data_dir / ARCHIVE_DIRNAME)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, url: str, html: str) -> str:
+        """
+        Archive a fetched page for url and return its hash
+        """
+        digest = content_hash(html)
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Written under a unique name and renamed, so concurrent puts of the same page are safe
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(gzip.compress(html.encode("utf-8"), mtime=0))
+            tmp.replace(path)
+            with self._lock:
+                self.stored += 1
+        with self._lock:
+            self.fetched[url] = digest
+            self.index[url] = {"hash": digest, "fetched_at": datetime.now(timezone.utc).isoformat()}
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        path = self._object_path(digest)
+        if not path.exists():
+            return None
+        return gzip.decompress(path.read_bytes()).decode("utf-8")
+
+    def run_manifest(self, run_key: Optional[str] = None) -> Dict[str, str]:
+        """
+        {profile_url: hash}: the pages fetched in run_key, or the newest page of every
+        profile when run_key is None
+        """
+        if run_key is None:
+            return {url: entry["hash"] for url, entry in self.index.items()}
+        with open(self.root / "runs" / f"{run_key}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, run_key: str):
+        runs_dir = self.root / "runs"
+        runs_dir.mkdir(parents=True, exist_ok=True)
+        if self.fetched:
+            with open(runs_dir / f"{run_key}.json", 'w', encoding='utf-8') as f:
+                json.dump(self.fetched, f, indent=2, sort_keys=True)
+        with open(self.root / INDEX_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        logging.info("Archived %d profile pages (%d new) in %s", len(self.fetched), self.stored, self.root)
+        self.prune()
+
+    def prune(self):
+        """
+        Keep the newest keep_runs manifests and every page they or the index refer to
+        """
+        manifests = sorted((self.root / "runs").glob("*.json"))
+        for path in manifests[:-self.keep_runs] if self.keep_runs > 0 else manifests:
+            path.unlink()
+        referenced = {entry["hash"] for entry in self.index.values()}
+        for path in (self.root / "runs").glob("*.json"):
+            with open(path, 'r', encoding='utf-8') as f:
+                referenced.update(json.load(f).values())
+        removed = 0
+        for path in (self.root / "objects").glob("*/*.html.gz"):
+            if path.name[:-len(".html.gz")] not in referenced:
+                path.unlink()
+                removed += 1
+        if removed:
+            logging.info("Pruned %d archived pages no kept run refers to", removed)
@@ -0,0 +1,130 @@
+import logging
+from typing import List, Dict, Callable, Optional
+from scrapper.utils import parse_earned_date
+
+# Bump whenever a change to the parsing (here, scrapper.parse_badges_from_soup or
+# utils.parse_earned_date) can change the badges extracted from the same page: profile
+# cache entries written by another version are not reused
+PARSER_VERSION = 1
+
+# Compiled-selector fast paths for the standard Cloud Skills Boost markup:
+#   div.profile-badge > ... span.ql-title-medium (name), span.ql-body-medium ("Earned <date>")
+# They mirror the first stage of scrapper.parse_badges_from_soup; the BeautifulSoup
+# cascade is only needed when the fast path finds nothing.
+
+def make_badge(badge_name: Optional[str], date_text: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Build a badge record from the raw name/date text, or None if the name is unusable
+    """
+    if not badge_name or len(badge_name) <= 3:
+        return None
+    if date_text and "Earned" in date_text:
+        date_text = date_text.replace("Earned", "").strip()
+
+    parsed_date = parse_earned_date(date_text) if date_text else None
+
+    return {
+        "badge_name": badge_name,
+        "earned_date_raw": date_text,
+        "earned_date": parsed_date.isoformat() if parsed_date else None
+    }
+
+def dedupe_badges(badges: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    De-duplicate by badge_name + raw date, keeping first occurrence
+    """
+    unique = []
+    seen = set()
+    for b in badges:
+        key = (b.get("badge_name"), b.get("earned_date_raw"))
+        if key not in seen:
+            unique.append(b)
+            seen.add(key)
+    return unique
+
+def _selectolax_parser():
+    # selectolax >= 1.0 only ships the lexbor backend; older releases have the modest HTMLParser
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+        return HTMLParser
+
+def _parse_with_selectolax(html: str) -> List[Dict[str, str]]:
+    parser = _selectolax_parser()
+    badges = []
+    for badge_el in parser(html).css("div.profile-badge"):
+        name_el = badge_el.css_first("span[class*='ql-title-medium']")
+        if name_el is None:
+            name_el = next((s for s in badge_el.css("span[class]") if "title" in s.attributes.get("class", "").lower()), None)
+        date_el = badge_el.css_first("span[class*='ql-body-medium']")
+        badge = make_badge(
+            name_el.text(separator="", strip=True) if name_el is not None else None,
+            date_el.text(separator="", strip=True) if date_el is not None else None,
+        )
+        if badge:
+            badges.append(badge)
+    return badges
+
+_lxml_xpaths = None
+
+def _parse_with_lxml(html: str) -> List[Dict[str, str]]:
+    global _lxml_xpaths
+    from lxml import etree, html as lxml_html
+    if _lxml_xpaths is None:
+        _lxml_xpaths = (
+            etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' profile-badge ')]"),
+            etree.XPath("(.//span[contains(@class, 'ql-title-medium')])[1]"),
+            etree.XPath("(.//span[contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'title')])[1]"),
+            etree.XPath("(.//span[contains(@class, 'ql-body-medium')])[1]"),
+        )
+    xp_badges, xp_title, xp_any_title, xp_date = _lxml_xpaths
+
+    def text_of(els):
+        # Same as BeautifulSoup get_text(strip=True): strip each text node, join without separator
+        return "".join(t.strip() for t in els[0].itertext()) if els else None
+
+    badges = []
+    for badge_el in xp_badges(lxml_html.document_fromstring(html)):
+        badge = make_badge(text_of(xp_title(badge_el) or xp_any_title(badge_el)), text_of(xp_date(badge_el)))
+        if badge:
+            badges.append(badge)
+    return badges
+
+FAST_PARSERS: Dict[str, Callable[[str], List[Dict[str, str]]]] = {
+    "selectolax": _parse_with_selectolax,
+    "lxml": _parse_with_lxml,
+}
+
+def resolve_backend(name: str) -> str:
+    """
+    Map a configured backend ("auto", "selectolax", "lxml" or "bs4") to one that is installed
+    """
+    name = (name or "auto").lower()
+    candidates = ["selectolax", "lxml"] if name == "auto" else [name]
+    for candidate in candidates:
+        if candidate not in FAST_PARSERS:
+            continue
+        try:
+            if candidate == "selectolax":
+                _selectolax_parser()
+            else:
+                import lxml.html  # noqa: F401
+            return candidate
+        except ImportError:
+            logging.info("Parser backend %s not installed", candidate)
+    return "bs4"
+
+def parse_badges_fast(html: str, backend: str) -> List[Dict[str, str]]:
+    """
+    Run a fast-path backend, returning [] if it is "bs4" or fails
+    """
+    parser = FAST_PARSERS.get(backend)
+    if parser is None:
+        return []
+    try:
+        return dedupe_badges(parser(html))
+    except Exception as e:
+        logging.debug("Fast parser %s failed: %s", backend, e)
+        return []
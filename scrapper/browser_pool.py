@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+BADGE_SELECTOR = "div.profile-badge"
+
+# Nothing in these is needed to read badge names and dates
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "hotjar.com",
+    "facebook.net",
+)
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by all scraping threads.
+    Async Playwright runs on a private event-loop thread; fetch() may be called from
+    any thread and blocks until the page HTML is ready. Up to `size` tabs render
+    concurrently and are reused between fetches. The browser is started lazily on the
+    first fetch and kept until close().
+    """
+
+    def __init__(self, size: int = 4, user_agent: Optional[str] = None,
+                 navigation_timeout: int = 30000, badge_timeout: int = 5000):
+        self.size = max(1, size)
+        self.user_agent = user_agent
+        self.navigation_timeout = navigation_timeout
+        self.badge_timeout = badge_timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._restarting: Optional[asyncio.Lock] = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+            except BaseException:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._stop(), loop).result()
+                except Exception:
+                    pass
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+        self._playwright = await async_playwright().start()
+        self._pages = asyncio.Queue()
+        self._restarting = asyncio.Lock()
+        await self._launch()
+        for _ in range(self.size):
+            self._pages.put_nowait(await self._context.new_page())
+        logging.info("Started Playwright browser pool with %d tabs", self.size)
+
+    async def _launch(self):
+        self._browser = await self._playwright.chromium.launch(headless=True, args=["--no-sandbox"])
+        self._context = await self._browser.new_context(user_agent=self.user_agent)
+        await self._context.route("**/*", self._route)
+
+    async def _replace_page(self, page):
+        """
+        Close a failed tab and put a fresh one in the pool. If the browser can't open one
+        it is relaunched with a full pool of tabs; the other tabs of the old browser are
+        closed with it and dropped as they come back, not replaced. If the relaunch fails
+        too, None is queued so waiting fetches fail instead of waiting for a tab forever.
+        """
+        try:
+            await page.close()
+        except Exception:
+            pass
+        async with self._restarting:
+            if page.context is not self._context:
+                # The browser was relaunched since this tab was opened
+                return
+            try:
+                self._pages.put_nowait(await self._context.new_page())
+                return
+            except Exception as e:
+                logging.warning("Could not open a new browser tab (%s), restarting the browser", e)
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            try:
+                await self._launch()
+                for _ in range(self.size):
+                    self._pages.put_nowait(await self._context.new_page())
+                logging.info("Restarted Playwright browser pool with %d tabs", self.size)
+            except Exception:
+                logging.exception("Could not restart the Playwright browser")
+                self._pages.put_nowait(None)
+
+    async def _stop(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = self._context = self._pages = self._restarting = None
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(p in request.url for p in BLOCKED_URL_PATTERNS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _fetch(self, url: str) -> str:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        page = await self._pages.get()
+        # Tabs of a browser that has since been restarted are closed; drop them
+        while page is not None and page.is_closed():
+            page = await self._pages.get()
+        if page is None:
+            # The browser couldn't be restarted; leave the marker for the next fetch
+            self._pages.put_nowait(None)
+            raise RuntimeError("Playwright browser pool has no working browser")
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=self.navigation_timeout)
+            # Return as soon as the first badge renders; profiles without badges
+            # never match, so give up after badge_timeout and take what is there
+            try:
+                await page.wait_for_selector(BADGE_SELECTOR, state="attached", timeout=self.badge_timeout)
+            except PlaywrightTimeoutError:
+                logging.debug("No %s on %s after %dms", BADGE_SELECTOR, url, self.badge_timeout)
+            html = await page.content()
+        except BaseException:
+            # The tab may be left mid-navigation or crashed; swap in a fresh one
+            await self._replace_page(page)
+            raise
+        self._pages.put_nowait(page)
+        return html
+
+    def fetch(self, url: str) -> str:
+        """
+        Render `url` in a pooled tab and return the page HTML
+        """
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop).result()
+
+    def close(self):
+        """
+        Shut down the browser and its event loop; a later fetch() starts a new one
+        """
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+            except Exception as e:
+                logging.warning("Error closing Playwright browser pool: %s", e)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
+            logging.info("Closed Playwright browser pool")
@@ -0,0 +1,35 @@
+import os
+import logging
+from pathlib import Path
+from functools import lru_cache
+from typing import Any, Dict
+
+CONFIG_PATH = Path(os.getenv("CONFIG_PATH", "config/config.yaml"))
+
+@lru_cache(maxsize=1)
+def load_config() -> Dict[str, Any]:
+    """
+    Load config/config.yaml once. Returns an empty dict if the file or PyYAML is missing,
+    so every setting falls back to its default.
+    """
+    if not CONFIG_PATH.exists():
+        logging.debug("No config file at %s, using defaults", CONFIG_PATH)
+        return {}
+    try:
+        import yaml
+    except ImportError:
+        logging.warning("PyYAML not installed, ignoring %s", CONFIG_PATH)
+        return {}
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logging.exception("Failed to load config %s: %s", CONFIG_PATH, e)
+        return {}
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """
+    Read config[section][key], e.g. get_setting("scraper", "max_retries", 3).
+    Environment variables take precedence over these values where callers check them first.
+    """
+    return (load_config().get(section) or {}).get(key, default)
@@ -1,8 +1,17 @@
 import re
+import json
+import hashlib
+import tempfile
 import requests
-from io import BytesIO
 import pandas as pd
 import logging
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple
+
+# Last download of the registration sheet, next to the file itself (sheet.csv / sheet.xlsx)
+SHEET_CACHE_FILENAME = "sheet_cache.json"
+_ZIP_MAGIC = b"PK"
 
 def extract_drive_file_id(url: str) -> str | None:
     """
@@ -26,34 +35,138 @@ def extract_drive_file_id(url: str) -> str | None:
         return m.group(1)
     return None
 
-def download_excel_to_df(drive_link: str) -> pd.DataFrame:
+def _export_urls(drive_link: str, file_id: str) -> List[Tuple[str, str]]:
     """
-    Downloads a publicly shared Drive file or Google Sheet and returns a pandas DataFrame.
+    (format, url) pairs to try in order: a Google Sheet's CSV export parses far faster
+    than its xlsx export; a plain Drive file can only be downloaded as is
+    """
+    if "spreadsheets" in drive_link:
+        base = f"https://docs.google.com/spreadsheets/d/{file_id}/export"
+        # The CSV export covers one tab: the one in the link, else the first, like read_excel
+        gid = re.search(r"[#&?]gid=(\d+)", drive_link)
+        return [
+            ("csv", f"{base}?format=csv" + (f"&gid={gid.group(1)}" if gid else "")),
+            ("xlsx", f"{base}?format=xlsx"),
+        ]
+    return [("xlsx", f"https://drive.google.com/uc?export=download&id={file_id}")]
+
+def _load_state(cache_dir: Path) -> Dict[str, Any]:
+    path = cache_dir / SHEET_CACHE_FILENAME
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning("Ignoring unreadable sheet cache %s: %s", path, e)
+    return {}
+
+def _fetch(url: str, fmt: str, dest: Path, cached: Dict[str, Any]) -> Dict[str, Any] | None:
+    """
+    Download url to dest, streaming and hashing it chunk by chunk. A conditional GET is
+    sent when dest holds an earlier download of the same URL; on 304 that copy is kept.
+    Returns the cache entry, or None when the response isn't a usable sheet.
+    """
+    headers = {}
+    if cached.get("url") == url and dest.exists():
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with requests.get(url, stream=True, timeout=30, headers=headers) as r:
+        if r.status_code == 304:
+            logging.info("Sheet unchanged since last download (304)")
+            return cached
+        if r.status_code != 200:
+            logging.warning("Failed to download %s export, status %s", fmt, r.status_code)
+            return None
+        # A sheet that isn't shared publicly answers with a sign-in page
+        if "text/html" in r.headers.get("Content-Type", ""):
+            logging.warning("The %s export returned an HTML page; is the sheet shared publicly?", fmt)
+            return None
+
+        digest = hashlib.sha256()
+        tmp = dest.with_name(dest.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                digest.update(chunk)
+                f.write(chunk)
+        if fmt == "xlsx":
+            with open(tmp, 'rb') as f:
+                if f.read(2) != _ZIP_MAGIC:
+                    logging.warning("Downloaded file is not an xlsx workbook")
+                    tmp.unlink()
+                    return None
+        tmp.replace(dest)
+        return {
+            "url": url,
+            "format": fmt,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "hash": digest.hexdigest(),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+def download_sheet(drive_link: str, cache_dir: Path) -> Tuple[Path, str, str]:
+    """
+    Download the registration sheet into cache_dir and return (path, format, content hash).
+    Tries the CSV export first for Google Sheets, then xlsx. If every download fails, the
+    copy from the last successful run is used.
     """
     file_id = extract_drive_file_id(drive_link)
     if not file_id:
         logging.error("Could not extract drive file id from link. Please provide a share link.")
         raise ValueError("Invalid drive link")
 
-    # Try Google Sheets export first
-    if "spreadsheets" in drive_link:
-        download_url = f"https://docs.google.com/spreadsheets/d/{file_id}/export?format=xlsx"
-        logging.info("Downloading Google Sheet as Excel from: %s", download_url)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    state = _load_state(cache_dir)
+    for fmt, url in _export_urls(drive_link, file_id):
+        dest = cache_dir / f"sheet.{fmt}"
+        logging.info("Downloading sheet as %s from: %s", fmt, url)
+        try:
+            entry = _fetch(url, fmt, dest, state)
+        except requests.RequestException as e:
+            logging.warning("Error downloading %s export: %s", fmt, e)
+            entry = None
+        if entry is not None:
+            with open(cache_dir / SHEET_CACHE_FILENAME, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2)
+            return dest, fmt, entry["hash"]
+
+    dest = cache_dir / f"sheet.{state.get('format')}"
+    if state.get("hash") and dest.exists():
+        logging.warning("Sheet download failed; using the copy from %s", state.get("fetched_at"))
+        return dest, state["format"], state["hash"]
+    raise RuntimeError("Could not download the registration sheet")
+
+def _excel_engine() -> str:
+    # calamine (python-calamine) reads xlsx several times faster than openpyxl when installed
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+def read_sheet(path: Path, fmt: str) -> pd.DataFrame:
+    if fmt == "csv":
+        df = pd.read_csv(path)
     else:
-        download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-        logging.info("Downloading Excel from: %s", download_url)
-    
+        # First sheet of the workbook
+        df = pd.read_excel(path, engine=_excel_engine())
+    logging.info("Successfully loaded DataFrame with %d rows and %d columns", len(df), len(df.columns))
+    logging.info("Columns: %s", list(df.columns))
+    return df
+
+def download_excel_to_df(drive_link: str, cache_dir: Path | None = None) -> pd.DataFrame:
+    """
+    Downloads a publicly shared Drive file or Google Sheet and returns a pandas DataFrame.
+    With a cache_dir the download is kept there and revalidated on the next call.
+    """
     try:
-        r = requests.get(download_url, stream=True, timeout=30)
-        if r.status_code != 200:
-            logging.error("Failed to download file, status %s", r.status_code)
-            r.raise_for_status()
-        content = BytesIO(r.content)
-        # Try reading first sheet
-        df = pd.read_excel(content, engine="openpyxl")
-        logging.info("Successfully loaded DataFrame with %d rows and %d columns", len(df), len(df.columns))
-        logging.info("Columns: %s", list(df.columns))
-        return df
+        if cache_dir is not None:
+            return read_sheet(*download_sheet(drive_link, cache_dir)[:2])
+        with tempfile.TemporaryDirectory() as tmp:
+            return read_sheet(*download_sheet(drive_link, Path(tmp))[:2])
     except Exception as e:
         logging.exception("Error downloading or parsing Excel file: %s", e)
         raise
@@ -0,0 +1,62 @@
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Dict, Any
+
+FINGERPRINTS_FILENAME = "fingerprints.json"
+
+def fingerprint(result: Dict[str, Any]) -> str:
+    """
+    Stable hash of everything about a participant that ends up in the outputs:
+    name, email and the (order-independent) badge list
+    """
+    badges = sorted(
+        (b.get("badge_name") or "", b.get("earned_date_raw") or "", b.get("earned_date") or "")
+        for b in result.get("badges", [])
+    )
+    payload = json.dumps([result.get("name"), result.get("email"), badges], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class FingerprintStore:
+    """
+    Per-participant fingerprints from the last successful run, keyed by profile URL
+    (data/fingerprints.json). Used by incremental runs to find what actually changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fingerprints: Dict[str, str] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.fingerprints = json.load(f)
+            except Exception as e:
+                logging.warning("Ignoring unreadable fingerprint store %s: %s", path, e)
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path) -> "FingerprintStore":
+        return cls(data_dir / FINGERPRINTS_FILENAME)
+
+    def changed(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Results that are new or differ from the stored fingerprint. Failed scrapes
+        are never reported as changes, so an error can't wipe a participant's badges.
+        """
+        # A URL listed twice is compared by its last result, which is what gets stored
+        current = {r.get("profile_url"): fingerprint(r) for r in results if not r.get("error")}
+        return [
+            r for r in results
+            if not r.get("error") and self.fingerprints.get(r.get("profile_url")) != current[r.get("profile_url")]
+        ]
+
+    def update(self, results: List[Dict[str, Any]]):
+        for r in results:
+            if r.get("profile_url") and not r.get("error"):
+                self.fingerprints[r["profile_url"]] = fingerprint(r)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.fingerprints, f, indent=2, sort_keys=True)
+        logging.info("Saved fingerprints: %s (%d participants)", self.path, len(self.fingerprints))
@@ -0,0 +1,181 @@
+import shutil
+import logging
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timezone, timedelta, date
+from typing import List, Dict, Any, Optional
+from scrapper.config import get_setting
+from scrapper.processor import flatten_results, MAX_BADGES
+
+HISTORY_DIRNAME = "history"
+TABLES = ("participants", "badges")
+
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC") if ts.tzinfo else ts.tz_localize("UTC")
+
+class HistoryStore:
+    """
+    Columnar leaderboard history, one pair of Parquet files per recorded run, partitioned
+    by the run's UTC date:
+      data/history/run_date=2025-10-25/<run_key>_participants.parquet
+      data/history/run_date=2025-10-25/<run_key>_badges.parquet
+    participants: run_key, scraped_at, rank, name, email, profile_url, total_badges,
+                  first_earned, last_earned (UTC), error
+    badges:       run_key, scraped_at, rank, profile_url, badge_name, earned_date (ISO, as scraped),
+                  earned_at (UTC), earned_date_raw
+    rank identifies a participant within a run, so it joins the two tables.
+    Partitions older than max_history_days are pruned whenever a run is recorded.
+    """
+
+    def __init__(self, root: Path, max_history_days: Optional[int] = 30):
+        self.root = root
+        self.max_history_days = max_history_days
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path) -> Optional["HistoryStore"]:
+        """
+        The store configured under data: in config.yaml, or None if history is turned off
+        or pyarrow isn't installed
+        """
+        if not get_setting("data", "keep_history", True):
+            return None
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logging.warning("pyarrow not installed; leaderboard history disabled")
+            return None
+        return cls(data_dir / HISTORY_DIRNAME, get_setting("data", "max_history_days", 30))
+
+    def _partition(self, run_date: date) -> Path:
+        return self.root / f"run_date={run_date.isoformat()}"
+
+    def _files(self, table: str) -> List[Path]:
+        return sorted(self.root.glob(f"run_date=*/*_{table}.parquet"), key=lambda p: p.name)
+
+    def append(self, run_key: str, results: List[Dict], scraped_at: Optional[datetime] = None) -> Path:
+        """
+        Record a run's results, returning the partition directory written to
+        """
+        scraped_at = scraped_at or datetime.now(timezone.utc)
+        participants, badges = flatten_results(results, MAX_BADGES)
+        scraped = _utc(scraped_at)
+
+        participants_df = pd.DataFrame({
+            "run_key": run_key,
+            "scraped_at": scraped,
+            "rank": participants["rank"].astype("int32"),
+            "name": participants["name"].astype("string"),
+            "email": participants["email"].astype("string"),
+            "profile_url": participants["profile_url"].astype("string"),
+            "total_badges": participants["total_badges"].astype("int16"),
+            "first_earned": participants["first_earned_utc"],
+            "last_earned": participants["last_earned_utc"],
+            "error": pd.Series([r.get("error") for r in results], dtype="string"),
+        })
+        badges_df = pd.DataFrame({
+            "run_key": run_key,
+            "scraped_at": scraped,
+            "rank": participants["rank"].astype("int32").take(badges["pid"]).to_numpy(),
+            "profile_url": participants["profile_url"].astype("string").take(badges["pid"]).to_numpy(),
+            "badge_name": badges["badge_name"].astype("string"),
+            "earned_date": badges["earned_date"].astype("string"),
+            "earned_at": badges["earned_utc"],
+            "earned_date_raw": badges["earned_date_raw"].astype("string"),
+        })
+
+        partition = self._partition(scraped.date())
+        partition.mkdir(parents=True, exist_ok=True)
+        participants_df.to_parquet(partition / f"{run_key}_participants.parquet", index=False, compression="zstd")
+        badges_df.to_parquet(partition / f"{run_key}_badges.parquet", index=False, compression="zstd")
+        logging.info("Saved history for run %s: %d participants, %d badges in %s",
+                     run_key, len(participants_df), len(badges_df), partition)
+
+        self.prune(scraped.to_pydatetime())
+        return partition
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete partitions older than max_history_days, returning how many were removed
+        """
+        if not self.max_history_days or not self.root.exists():
+            return 0
+        cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=self.max_history_days)).date()
+        removed = 0
+        for partition in self.root.glob("run_date=*"):
+            try:
+                run_date = date.fromisoformat(partition.name.split("=", 1)[1])
+            except ValueError:
+                continue
+            if run_date < cutoff:
+                shutil.rmtree(partition)
+                removed += 1
+        if removed:
+            logging.info("Pruned %d history partitions older than %s", removed, cutoff)
+        return removed
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        """
+        Recorded runs, oldest first: [{run_key, run_date}, ...]
+        """
+        return [
+            {"run_key": p.name[:-len("_participants.parquet")], "run_date": p.parent.name.split("=", 1)[1]}
+            for p in self._files("participants")
+        ]
+
+    def load_run(self, run_key: Optional[str] = None, table: str = "participants") -> pd.DataFrame:
+        """
+        One run's participants or badges table; the latest run if run_key is None
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown history table: {table}")
+        files = self._files(table)
+        if run_key is not None:
+            files = [p for p in files if p.name == f"{run_key}_{table}.parquet"]
+        if not files:
+            raise FileNotFoundError(f"No {table} history for run {run_key or '(latest)'} in {self.root}")
+        return pd.read_parquet(files[-1])
+
+    def load_range(self, start: datetime, end: Optional[datetime] = None, table: str = "participants") -> pd.DataFrame:
+        """
+        Rows from every run scraped between start and end (inclusive, default now), oldest first
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown history table: {table}")
+        start, end = _utc(start), _utc(end or datetime.now(timezone.utc))
+        # Partition names narrow the files down before anything is read
+        files = [
+            p for p in self._files(table)
+            if start.date().isoformat() <= p.parent.name.split("=", 1)[1] <= end.date().isoformat()
+        ]
+        if not files:
+            return pd.DataFrame()
+        df = pd.concat([pd.read_parquet(p) for p in files], ignore_index=True)
+        return df[(df["scraped_at"] >= start) & (df["scraped_at"] <= end)].reset_index(drop=True)
+
+    def load_results(self, run_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        A run in the scraper's result format ({name, email, profile_url, badges, error}),
+        in the order the participants were scraped
+        """
+        participants = self.load_run(run_key, "participants")
+        badges = self.load_run(participants["run_key"].iloc[0] if len(participants) else run_key, "badges")
+        badges_by_rank: Dict[int, List[Dict[str, Any]]] = {}
+        for rank, name, iso, raw in zip(badges["rank"], badges["badge_name"], badges["earned_date"], badges["earned_date_raw"]):
+            badges_by_rank.setdefault(rank, []).append({
+                "badge_name": name,
+                "earned_date_raw": None if pd.isna(raw) else raw,
+                "earned_date": None if pd.isna(iso) else iso,
+            })
+        return [
+            {
+                "name": None if pd.isna(name) else name,
+                "email": None if pd.isna(email) else email,
+                "profile_url": url,
+                "badges": badges_by_rank.get(rank, []),
+                "error": None if pd.isna(error) else error,
+            }
+            for rank, name, email, url, error in zip(
+                participants["rank"], participants["name"], participants["email"], participants["profile_url"], participants["error"]
+            )
+        ]
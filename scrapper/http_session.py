@@ -0,0 +1,81 @@
+import os
+from itertools import takewhile
+from typing import Dict, Callable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scrapper.config import get_setting
+
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", get_setting("scraper", "max_retries", 3)))
+RETRY_DELAY = float(os.getenv("RETRY_DELAY", get_setting("scraper", "retry_delay", 5)))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", get_setting("scraper", "retry_max_delay", 60)))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def _accept_encoding() -> str:
+    # requests only decodes brotli when the brotli package is installed
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+def _retry_class(on_retry: Callable[[Optional[int]], None] | None = None,
+                 before_retry: Callable[[], None] | None = None) -> type:
+    """
+    Retry subclass that waits RETRY_DELAY, 2*RETRY_DELAY, ... (at most RETRY_MAX_DELAY,
+    which also caps a server's Retry-After) before each retry. urllib3 retries inside the
+    adapter, so callers never see the retries otherwise: on_retry is told about every
+    retried attempt (its status, or None for a connection error), and before_retry is
+    called right before each one is sent (e.g. to take a rate limiter token).
+    """
+    class ScraperRetry(Retry):
+        def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+            # Raises once the retries are used up, so only attempts that will be retried are reported
+            retry = super().increment(method, url, response, error, _pool, _stacktrace)
+            if on_retry is not None and (error is not None or (response is not None and response.status in RETRY_STATUSES)):
+                on_retry(response.status if response is not None else None)
+            return retry
+
+        def get_backoff_time(self) -> float:
+            # urllib3 sends the first retry immediately; count errors since the last redirect as it does
+            errors = len(list(takewhile(lambda h: h.redirect_location is None, reversed(self.history))))
+            return min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** (errors - 1)) if errors else 0.0
+
+        def get_retry_after(self, response) -> Optional[float]:
+            retry_after = super().get_retry_after(response)
+            return min(RETRY_MAX_DELAY, retry_after) if retry_after is not None else None
+
+        def sleep(self, response=None):
+            super().sleep(response)
+            if before_retry is not None:
+                before_retry()
+    return ScraperRetry
+
+def build_session(pool_size: int, headers: Dict[str, str] | None = None,
+                  on_retry: Callable[[Optional[int]], None] | None = None,
+                  before_retry: Callable[[], None] | None = None) -> requests.Session:
+    """
+    Build a keep-alive session shared by all scraping workers.
+    Transient failures (connection errors, 429 and 5xx) are retried up to MAX_RETRIES
+    times with exponential backoff starting at RETRY_DELAY seconds; a Retry-After
+    header on 429/503 overrides the backoff. Both are capped at RETRY_MAX_DELAY. After
+    the last retry the final response is returned instead of raising, so callers still
+    see the status code.
+    on_retry, if given, is called for each retried attempt (used for adaptive rate limiting);
+    before_retry right before each retry is sent (used to keep retries within the rate limit).
+    """
+    retry = _retry_class(on_retry, before_retry)(
+        total=MAX_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers or {})
+    session.headers["Accept-Encoding"] = _accept_encoding()
+    return session
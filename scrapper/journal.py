@@ -0,0 +1,112 @@
+import json
+import logging
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Iterable, Iterator, Tuple, Optional
+
+# Keep this many journals around for inspection; older ones are pruned on start
+KEEP_JOURNALS = 10
+
+class RunJournal:
+    """
+    Append-only JSONL log of a scrape run (data/runs/<run_key>.jsonl).
+    Records, one per line:
+      {"type": "start", "run_key", "started_at", "total"}
+      {"type": "supabase_run", "id"}                 - the runs table row for this run
+      {"type": "result", "profile_url", "result"}    - one per scraped profile
+      {"type": "complete", "finished_at"}
+    A journal without a "complete" record belongs to an interrupted run, which the next
+    run resumes: profiles with a successful result are not fetched again, and the same
+    Supabase run record is reused.
+    """
+
+    def __init__(self, path: Path, run_key: str, started_at: str):
+        self.path = path
+        self.run_key = run_key
+        self.started_at = started_at
+        self.supabase_run_id = None
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _append(self, record: Dict[str, Any]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def start(cls, journal_dir: Path, total: int) -> "RunJournal":
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        for old in sorted(journal_dir.glob("*.jsonl"))[:-KEEP_JOURNALS + 1]:
+            old.unlink()
+        now = datetime.now(timezone.utc)
+        run_key = now.strftime('%Y%m%d_%H%M%S')
+        journal = cls(journal_dir / f"{run_key}.jsonl", run_key, now.isoformat())
+        journal._append({"type": "start", "run_key": run_key, "started_at": journal.started_at, "total": total})
+        logging.info("Started run journal: %s", journal.path)
+        return journal
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["RunJournal"]:
+        journal = None
+        complete = False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of a run killed mid-write
+                    logging.warning("Skipping truncated line in %s", path)
+                    continue
+                kind = record.get("type")
+                if kind == "start":
+                    journal = cls(path, record["run_key"], record["started_at"])
+                    complete = False
+                elif journal is None:
+                    continue
+                elif kind == "supabase_run":
+                    journal.supabase_run_id = record.get("id")
+                elif kind == "result":
+                    journal.results[record["profile_url"]] = record["result"]
+                elif kind == "complete":
+                    complete = True
+        return None if complete else journal
+
+    @classmethod
+    def resume_latest(cls, journal_dir: Path, max_age_hours: float) -> Optional["RunJournal"]:
+        """
+        The most recent journal if its run never completed and started within max_age_hours
+        """
+        journals = sorted(journal_dir.glob("*.jsonl"))
+        if not journals:
+            return None
+        journal = cls.load(journals[-1])
+        if journal is None:
+            return None
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(journal.started_at)
+        if age > timedelta(hours=max_age_hours):
+            logging.info("Not resuming run %s: started %s ago", journal.run_key, age)
+            return None
+        return journal
+
+    def completed_results(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Results that don't need refetching, keyed by profile URL
+        """
+        return {url: r for url, r in self.results.items() if not r.get("error")}
+
+    def set_supabase_run(self, run_id: Any):
+        self.supabase_run_id = run_id
+        self._append({"type": "supabase_run", "id": run_id})
+
+    def record(self, items: Iterable[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Pass (index, result) pairs through, journaling each result before it is yielded
+        """
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for i, result in items:
+                f.write(json.dumps({"type": "result", "profile_url": result.get("profile_url"), "result": result}, ensure_ascii=False) + "\n")
+                f.flush()
+                self.results[result.get("profile_url")] = result
+                yield i, result
+
+    def complete(self):
+        self._append({"type": "complete", "finished_at": datetime.now(timezone.utc).isoformat()})
+        logging.info("Completed run journal: %s", self.path)
@@ -0,0 +1,114 @@
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import List, Dict, Any, Callable, Tuple, Optional
+
+# (key, badges or None, error or None, parse seconds)
+ParsedPage = Tuple[Any, Optional[List[Dict[str, str]]], Optional[str], float]
+
+def _parse_chunk(parse: Callable[[str], List[Dict[str, str]]], pages: List[str]) -> List[Tuple[Optional[List], Optional[str], float]]:
+    """
+    Runs in a worker process: parse each page, returning (badges, error, seconds)
+    """
+    parsed = []
+    for html in pages:
+        start = time.perf_counter()
+        try:
+            parsed.append((parse(html), None, time.perf_counter() - start))
+        except Exception as e:
+            parsed.append((None, str(e), time.perf_counter() - start))
+    return parsed
+
+def _context():
+    # Forking while the fetch threads hold locks (logging, urllib3 pools) can deadlock the
+    # child; forkserver children start from a clean single-threaded process
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+class ParsePool:
+    """
+    Parses fetched pages in worker processes, away from the GIL the fetch threads share.
+    Pages are buffered and sent chunk_size at a time, so the pickling and IPC cost is paid
+    per chunk rather than per page; flush() sends a partial chunk, which the caller does
+    when a process would otherwise sit idle. Not thread-safe: one thread adds pages and
+    collects results.
+    """
+
+    def __init__(self, workers: int, chunk_size: int, parse: Callable[[str], List[Dict[str, str]]]):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.parse = parse
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=_context())
+        # Start the processes (and their imports of the parser module) while the first pages download
+        for _ in range(workers):
+            self._executor.submit(_parse_chunk, parse, [])
+        self._buffer: List[Tuple[Any, str]] = []
+        self.futures: Dict[Future, List[Any]] = {}
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def add(self, key: Any, html: str):
+        self._buffer.append((key, html))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        keys = [key for key, _ in self._buffer]
+        future = self._executor.submit(_parse_chunk, self.parse, [html for _, html in self._buffer])
+        self.futures[future] = keys
+        self._buffer = []
+
+    def collect(self, future: Future) -> List[ParsedPage]:
+        """
+        Results of a finished chunk; a crashed worker fails every page in its chunk
+        """
+        keys = self.futures.pop(future)
+        try:
+            return [(key, *parsed) for key, parsed in zip(keys, future.result())]
+        except Exception as e:
+            logging.exception("Parse worker failed on a chunk of %d pages", len(keys))
+            return [(key, None, str(e), 0.0) for key in keys]
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class StageTimings:
+    """
+    Time spent per scrape stage (fetch, parse), summed over profiles, to size the
+    fetch threads and parse processes independently
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.seconds.clear()
+            self.counts.clear()
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(
+                f"{stage} {self.counts[stage]} x {self.seconds[stage] / self.counts[stage] * 1000:.0f}ms "
+                f"({self.seconds[stage]:.1f}s total)"
+                for stage in self.seconds
+            ) or "nothing fetched"
@@ -0,0 +1,135 @@
+import json
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from scrapper.fetch_excel import download_sheet, read_sheet
+
+# Header variations seen in the registration sheet, in order of preference
+NAME_COLUMNS = ["Your Full Name", "Full Name", "Your full name", "Name"]
+EMAIL_COLUMNS = ["Email", "Email Address", "email"]
+PROFILE_HOST = "cloudskillsboost.google"
+
+# Participant list parsed from the last sheet download, reused while the sheet is unchanged.
+# Bump the version when build_participants changes what it returns.
+PARTICIPANTS_CACHE_FILENAME = "participants.json"
+PARTICIPANTS_CACHE_VERSION = 1
+
+def resolve_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Work out once which sheet columns hold the profile URL, name and email:
+    {"profile_url": column, "name": [columns...], "email": [columns...]}
+    The name/email lists are in order of preference; the first non-empty value per row wins.
+    """
+    # Look for column containing URLs (cloudskillsboost.google or public_profiles in the name)
+    profile_col_candidates = [
+        col for col in df.columns
+        if any(marker in str(col).lower() for marker in ("cloudskillsboost", "public_profiles", "profile url"))
+    ]
+
+    # Second try: look for columns containing actual URLs in the data
+    if not profile_col_candidates:
+        logging.info("Trying to detect profile URL column from data content...")
+        for col in df.columns:
+            sample_values = df[col].dropna().head(5)
+            url_count = sum(1 for val in sample_values if isinstance(val, str) and PROFILE_HOST in val.lower())
+            if url_count > 0:
+                profile_col_candidates.append(col)
+                logging.info("Found column '%s' with %d URLs in sample", col, url_count)
+
+    if not profile_col_candidates:
+        # fall back to last column
+        profile_col = df.columns[-1] if len(df.columns) >= 1 else df.columns[0]
+        logging.warning("Could not detect profile url column automatically. Using fallback column: %s", profile_col)
+    else:
+        profile_col = profile_col_candidates[0]
+        logging.info("Detected profile URL column: %s", profile_col)
+
+    # Prefer the Skills Boost email column over the generic ones
+    email_cols = [col for col in df.columns if "email address" in str(col).lower() and "skills boost" in str(col).lower()]
+    if not email_cols:
+        email_cols = [col for col in EMAIL_COLUMNS if col in df.columns]
+
+    return {
+        "profile_url": profile_col,
+        "name": [col for col in NAME_COLUMNS if col in df.columns],
+        "email": email_cols,
+    }
+
+def _first_present(df: pd.DataFrame, cols: List[Any]) -> pd.Series:
+    """
+    Per row, the stripped text of the first column with a value, or ""
+    """
+    values = pd.Series(pd.NA, index=df.index, dtype=object)
+    for col in reversed(cols):
+        values = df[col].astype(object).where(df[col].notna(), values)
+    return values.astype("string").str.strip().fillna("")
+
+def normalize_profile_urls(urls: pd.Series) -> pd.Series:
+    """
+    Key used to spot the same profile entered twice: scheme, "www.", query string,
+    fragment, trailing slashes and case are ignored
+    """
+    return (
+        urls.str.lower()
+        .str.replace(r"^https?://(www\.)?", "", regex=True)
+        .str.replace(r"[?#].*$", "", regex=True)
+        .str.rstrip("/")
+    )
+
+def build_participants(df: pd.DataFrame, columns: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Participants with a Cloud Skills Boost profile URL, in sheet order:
+    [{row_index, name, email, profile_url}, ...]
+    Rows listing a profile that an earlier row already has are dropped.
+    """
+    columns = columns or resolve_columns(df)
+    if df.empty:
+        return []
+
+    urls = df[columns["profile_url"]].astype("string").str.strip()
+    is_http = urls.str.startswith("http").fillna(False).astype(bool)
+    is_profile = is_http & urls.str.lower().str.contains(PROFILE_HOST, regex=False).fillna(False).astype(bool)
+
+    for idx, url in urls[is_http & ~is_profile].items():
+        logging.warning("Skipping row %d: URL doesn't look like Cloud Skills Boost: %s", idx, url[:50])
+
+    duplicate = normalize_profile_urls(urls[is_profile]).duplicated(keep="first")
+    if duplicate.any():
+        logging.info("Skipping %d rows that repeat an earlier profile URL", int(duplicate.sum()))
+    keep = is_profile.copy()
+    keep[duplicate[duplicate].index] = False
+
+    names = _first_present(df, columns["name"])[keep].replace("", "Unknown")
+    emails = _first_present(df, columns["email"])[keep]
+
+    return [
+        {"row_index": int(idx), "name": name, "email": email, "profile_url": url}
+        for idx, name, email, url in zip(urls[keep].index, names, emails, urls[keep])
+    ]
+
+def load_participants(drive_link: str, cache_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Download the registration sheet (revalidating the copy in cache_dir) and build the
+    participant list; when the sheet's content hash matches the last run, the list
+    saved then is returned without parsing the sheet
+    """
+    path, fmt, digest = download_sheet(drive_link, cache_dir)
+    key = f"{PARTICIPANTS_CACHE_VERSION}:{digest}"
+    cache_path = cache_dir / PARTICIPANTS_CACHE_FILENAME
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                logging.info("Sheet unchanged, reusing %d parsed participants", len(cached["participants"]))
+                return cached["participants"]
+        except Exception as e:
+            logging.warning("Ignoring unreadable participant cache %s: %s", cache_path, e)
+
+    df = read_sheet(path, fmt)
+    logging.info("Sheet downloaded: %d rows", len(df))
+    participants = build_participants(df)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({"key": key, "participants": participants}, f, ensure_ascii=False)
+    return participants
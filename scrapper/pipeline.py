@@ -0,0 +1,167 @@
+import csv
+import json
+import queue
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Tuple, Optional
+from scrapper.supbase_client import SupabaseClient, BATCH_SIZE, MAX_BADGES
+from scrapper.fingerprints import FingerprintStore
+from scrapper.processor import format_earned_dates
+
+# Streaming run: results flow from the scraper to every sink as each profile completes,
+# so partial output survives a crash and Supabase is updated while the scrape runs.
+
+_DONE = object()
+
+class Sink(ABC):
+    """
+    Consumer of scrape results in a streaming run. write() is called from the sink's
+    own thread once per result, in completion order; close() once at the end.
+    """
+
+    @abstractmethod
+    def write(self, result: Dict[str, Any]):
+        pass
+
+    def close(self):
+        pass
+
+class JsonlSink(Sink):
+    """
+    Appends each result as one JSON line, flushed immediately
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._f = open(path, 'w', encoding='utf-8')
+
+    def write(self, result: Dict[str, Any]):
+        self._f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+        logging.info("Saved streamed results: %s", self.path)
+
+class CsvAppendSink(Sink):
+    """
+    Appends one row per badge, with the columns and date format of leaderboard_detailed.csv
+    """
+    FIELDS = ["name", "email", "profile_url", "badge_name", "earned_date", "earned_date_raw"]
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._f = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._f, fieldnames=self.FIELDS)
+        self._writer.writeheader()
+
+    def write(self, result: Dict[str, Any]):
+        badges = result.get("badges", [])[:MAX_BADGES]
+        earned_dates = format_earned_dates([b.get("earned_date") for b in badges])
+        for b, earned_date in zip(badges, earned_dates):
+            self._writer.writerow({
+                "name": result.get("name"),
+                "email": result.get("email"),
+                "profile_url": result.get("profile_url"),
+                "badge_name": b.get("badge_name"),
+                "earned_date": earned_date,
+                "earned_date_raw": b.get("earned_date_raw")
+            })
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+        logging.info("Saved streamed badges: %s", self.path)
+
+class SupabaseBatchSink(Sink):
+    """
+    Pushes results to Supabase in batches of `batch_size` and recomputes ranks once on close.
+    With a FingerprintStore, only participants that changed since the last run are pushed.
+    Failed scrapes are never pushed, so an error can't replace stored badges with none.
+    """
+
+    def __init__(self, supa: SupabaseClient, batch_size: int = BATCH_SIZE, fingerprints: Optional[FingerprintStore] = None):
+        self.supa = supa
+        self.batch_size = batch_size
+        self.fingerprints = fingerprints
+        self.pushed: List[Dict[str, Any]] = []
+        self.success_count = 0
+        self.failure_count = 0
+        self.badge_sync = {"added": 0, "removed": 0, "unchanged": 0}
+        self._batch: List[Dict[str, Any]] = []
+
+    def write(self, result: Dict[str, Any]):
+        if result.get("error"):
+            return
+        if self.fingerprints is not None and not self.fingerprints.changed([result]):
+            return
+        self._batch.append(result)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        success_count, failure_count = self.supa.upsert_participants_and_badges(self._batch, update_ranks=False)
+        self.success_count += success_count
+        self.failure_count += failure_count
+        for key in self.badge_sync:
+            self.badge_sync[key] += self.supa.last_badge_sync.get(key, 0)
+        self.pushed.extend(self._batch)
+        self._batch = []
+
+    def close(self):
+        self._flush()
+        self.supa.update_ranks()
+
+def _drain(sink: Sink, q: queue.Queue):
+    failed = False
+    while True:
+        result = q.get()
+        if result is _DONE:
+            break
+        if failed:
+            continue
+        try:
+            sink.write(result)
+        except Exception as e:
+            # Keep draining so the producer never blocks on a dead sink
+            logging.exception("Sink %s failed, dropping its remaining results: %s", type(sink).__name__, e)
+            failed = True
+    try:
+        sink.close()
+    except Exception as e:
+        logging.exception("Failed to close sink %s: %s", type(sink).__name__, e)
+
+def run_pipeline(items: Iterable[Tuple[int, Dict[str, Any]]], total: int, sinks: List[Sink],
+                 buffer_size: int = 100) -> List[Dict[str, Any]]:
+    """
+    Feed (index, result) pairs, e.g. from scrapper.iter_profile_badges, to every sink
+    concurrently and return all results ordered by index.
+    Each sink runs in its own thread behind a queue of `buffer_size`; when a sink falls
+    behind, put() blocks, the producer stops pulling from `items`, and the scrape pauses.
+    """
+    queues = [queue.Queue(maxsize=buffer_size) for _ in sinks]
+    threads = [
+        threading.Thread(target=_drain, args=(sink, q), name=f"sink-{type(sink).__name__}", daemon=True)
+        for sink, q in zip(sinks, queues)
+    ]
+    for t in threads:
+        t.start()
+    
+    results: List[Dict[str, Any]] = [None] * total
+    try:
+        for i, result in items:
+            results[i] = result
+            for q in queues:
+                q.put(result)
+    finally:
+        for q in queues:
+            q.put(_DONE)
+        for t in threads:
+            t.join()
+    return results
@@ -1,8 +1,93 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Tuple
+
+# Badges counted per participant; anything past this is ignored
+MAX_BADGES = 19
+
+def flatten_results(results: List[Dict], max_badges: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Flatten results into two frames:
+      - participants: one row per result, in input order
+      - badges: one row per badge, with "pid" (the participant's row) and "earned_utc",
+        every earned date parsed to UTC in a single to_datetime call
+    Each participant also gets total_badges, the original earned_date strings of its
+    latest/earliest badge (last_earned/first_earned), the same in UTC (last_earned_utc/
+    first_earned_utc) and its leaderboard rank.
+    """
+    badge_lists = []
+    for r in results:
+        badges = r.get("badges", [])
+        if max_badges is not None and len(badges) > max_badges:
+            logging.info("Capping badges for %s from %d to %d", r.get("name"), len(badges), max_badges)
+            badges = badges[:max_badges]
+        badge_lists.append(badges)
+    counts = [len(b) for b in badge_lists]
+    flat = [b for badges in badge_lists for b in badges]
+
+    participants = pd.DataFrame({
+        "name": [r.get("name") for r in results],
+        "email": [r.get("email") for r in results],
+        "profile_url": [r.get("profile_url") for r in results],
+        "total_badges": np.array(counts, dtype=np.int64),
+    })
+    badges = pd.DataFrame({
+        "pid": np.repeat(np.arange(len(results), dtype=np.int64), counts),
+        "badge_name": [b.get("badge_name") for b in flat],
+        "earned_date": pd.Series([b.get("earned_date") for b in flat], dtype=object),
+        "earned_date_raw": [b.get("earned_date_raw") for b in flat],
+    })
+    badges["earned_utc"] = _parse_utc(badges["earned_date"])
+
+    # Latest/earliest badge per participant; on ties the first badge listed wins, like max()/min()
+    dated = badges[badges["earned_utc"].notna()]
+    by_participant = dated.groupby("pid")["earned_utc"]
+    latest = dated[dated["earned_utc"] == by_participant.transform("max")].drop_duplicates("pid")
+    earliest = dated[dated["earned_utc"] == by_participant.transform("min")].drop_duplicates("pid")
+
+    positions = np.arange(len(results))
+    latest, earliest = latest.set_index("pid"), earliest.set_index("pid")
+    participants["last_earned"] = latest["earned_date"].reindex(positions).reset_index(drop=True)
+    participants["first_earned"] = earliest["earned_date"].reindex(positions).reset_index(drop=True)
+    participants["last_earned_utc"] = latest["earned_utc"].reindex(positions).reset_index(drop=True)
+    participants["first_earned_utc"] = earliest["earned_utc"].reindex(positions).reset_index(drop=True)
+
+    # Ranking: sort by total_badges desc, tie-breaker earliest last_earned (i.e., smaller last_earned date wins);
+    # participants without dates go last. Remaining ties go by profile_url, as in SupabaseClient.update_ranks,
+    # so the CSVs and the database agree on every rank.
+    order = participants.sort_values(
+        by=['total_badges', 'last_earned_utc', 'profile_url'], ascending=[False, True, True], na_position='last'
+    ).index
+    participants["rank"] = 0
+    participants.loc[order, "rank"] = np.arange(1, len(participants) + 1)
+    return participants, badges
+
+def _parse_utc(iso_dates: pd.Series) -> pd.Series:
+    """
+    Parse ISO timestamps to UTC, NaT where missing or unparseable. Badges share a
+    handful of dates, so each distinct string is parsed once.
+    """
+    codes, uniques = pd.factorize(iso_dates)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), utc=True, errors="coerce", format="ISO8601")
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=iso_dates.index)
+
+def _display_dates(iso_dates: pd.Series, valid: pd.Series) -> pd.Series:
+    """
+    ISO timestamps as the CSVs show them ("2025-10-25 00:00:00-04:00"), keeping the
+    original UTC offset; dates that aren't valid become None
+    """
+    return iso_dates.where(valid).str.replace("T", " ", n=1).astype(object).where(valid, None)
+
+def format_earned_dates(iso_dates: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    The earned_date column of leaderboard_detailed.csv for these badge dates, for
+    writers that produce its rows one participant at a time
+    """
+    dates = pd.Series(iso_dates, dtype=object)
+    return _display_dates(dates, _parse_utc(dates).notna()).tolist()
 
 def build_and_save_csvs(results: List[Dict], data_dir: Path):
     """
@@ -10,74 +95,21 @@ def build_and_save_csvs(results: List[Dict], data_dir: Path):
       - detailed_df: one row per badge
       - summary_df: one row per participant summary
     Saves them to data_dir and returns (summary_df, detailed_df)
+    Dates are kept in each badge's own UTC offset, exactly as written to the CSVs.
     """
-    detailed_rows = []
-    summary_rows = []
-    
-    for r in results:
-        badges = r.get("badges", [])
-        
-        # Cap badges at maximum of 19
-        MAX_BADGES = 19
-        if len(badges) > MAX_BADGES:
-            logging.info("Capping badges for %s from %d to %d", r.get("name"), len(badges), MAX_BADGES)
-            badges = badges[:MAX_BADGES]
-        
-        # Build detailed rows (one per badge)
-        for b in badges:
-            earned_date = b.get("earned_date")
-            try:
-                earned_date_parsed = pd.to_datetime(earned_date) if earned_date else None
-            except Exception:
-                earned_date_parsed = None
-            
-            detailed_rows.append({
-                "name": r.get("name"),
-                "email": r.get("email"),
-                "profile_url": r.get("profile_url"),
-                "badge_name": b.get("badge_name"),
-                "earned_date": earned_date_parsed,
-                "earned_date_raw": b.get("earned_date_raw")
-            })
-        
-        # Build summary row (one per participant)
-        total_badges = len(badges)
-        
-        # compute latest earned date (max) and earliest (min)
-        dates = []
-        for b in badges:
-            if b.get("earned_date"):
-                try:
-                    dates.append(pd.to_datetime(b.get("earned_date")))
-                except:
-                    pass
-        
-        last_earned = max(dates) if dates else None
-        first_earned = min(dates) if dates else None
-        
-        summary_rows.append({
-            "name": r.get("name"),
-            "email": r.get("email"),
-            "profile_url": r.get("profile_url"),
-            "total_badges": total_badges,
-            "last_earned": last_earned,
-            "first_earned": first_earned,
-            "error": r.get("error")
-        })
+    participants, badges = flatten_results(results, MAX_BADGES)
 
-    detailed_df = pd.DataFrame(detailed_rows)
-    summary_df = pd.DataFrame(summary_rows)
+    detailed_df = participants[["name", "email", "profile_url"]].iloc[badges["pid"]].reset_index(drop=True)
+    detailed_df["badge_name"] = badges["badge_name"].to_numpy()
+    detailed_df["earned_date"] = _display_dates(badges["earned_date"], badges["earned_utc"].notna()).to_numpy()
+    detailed_df["earned_date_raw"] = badges["earned_date_raw"].to_numpy()
 
-    # Ranking: sort by total_badges desc, tie-breaker earliest last_earned (i.e., smaller last_earned date wins)
-    if not summary_df.empty:
-        # Convert all dates to UTC and remove timezone info to avoid comparison issues
-        summary_df['last_earned_filled'] = summary_df['last_earned'].apply(
-            lambda x: pd.Timestamp.max.tz_localize(None) if pd.isna(x) 
-            else (x.tz_localize(None) if x.tz is None else x.tz_convert('UTC').tz_localize(None))
-        )
-        summary_df = summary_df.sort_values(by=['total_badges', 'last_earned_filled'], ascending=[False, True])
-        summary_df['rank'] = range(1, len(summary_df) + 1)
-        summary_df.drop(columns=['last_earned_filled'], inplace=True)
+    summary_df = participants[["name", "email", "profile_url", "total_badges"]].copy()
+    summary_df["last_earned"] = _display_dates(participants["last_earned"], participants["last_earned"].notna())
+    summary_df["first_earned"] = _display_dates(participants["first_earned"], participants["first_earned"].notna())
+    summary_df["error"] = [r.get("error") for r in results]
+    summary_df["rank"] = participants["rank"]
+    summary_df = summary_df.sort_values("rank")
 
     # Save to CSV
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -88,9 +120,30 @@ def build_and_save_csvs(results: List[Dict], data_dir: Path):
 
     logging.info("Saved summary: %s (%d rows)", summary_path, len(summary_df))
     logging.info("Saved detailed: %s (%d rows)", detailed_path, len(detailed_df))
-    
+
     return summary_df, detailed_df
 
+def build_leaderboard_json(results: List[Dict]) -> Dict:
+    """
+    The leaderboard JSON document (leaderboard_latest) for results, badges capped at MAX_BADGES
+    """
+    participants = []
+    for r in results:
+        badges = r.get("badges", [])[:MAX_BADGES]
+        participants.append({
+            "name": r.get("name"),
+            "email": r.get("email"),
+            "profile_url": r.get("profile_url"),
+            "total_badges": len(badges),
+            "badges": badges,
+            "error": r.get("error")
+        })
+    return {
+        "scraped_at": datetime.now(timezone.utc).isoformat(),
+        "total_participants": len(results),
+        "participants": participants
+    }
+
 def compute_summary(results: List[Dict]) -> List[Dict]:
     """
     Build a structure suitable for upserting to database.
@@ -100,30 +153,19 @@ def compute_summary(results: List[Dict]) -> List[Dict]:
       badges: [ {badge_name,earned_date,earned_date_raw}, ... ]
     }
     """
-    out = []
-    import pandas as pd
-    
-    for r in results:
-        badges = r.get("badges", [])
-        dates = []
-        for b in badges:
-            if b.get("earned_date"):
-                try:
-                    dates.append(pd.to_datetime(b.get("earned_date")))
-                except:
-                    pass
-        
-        last_earned = max(dates).to_pydatetime().isoformat() if dates else None
-        
-        out.append({
+    participants, _ = flatten_results(results)
+    last_earned = participants["last_earned"].astype(object).where(participants["last_earned"].notna(), None)
+
+    return [
+        {
             "participant": {
                 "full_name": r.get("name"),
                 "email": r.get("email"),
                 "profile_url": r.get("profile_url"),
-                "total_badges": len(badges),
-                "last_earned": last_earned
+                "total_badges": int(total),
+                "last_earned": last
             },
-            "badges": badges
-        })
-    
-    return out
+            "badges": r.get("badges", [])
+        }
+        for r, total, last in zip(results, participants["total_badges"], last_earned)
+    ]
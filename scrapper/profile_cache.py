@@ -0,0 +1,151 @@
+import re
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+from scrapper.serialization import find_json, read_json
+from scrapper.badge_parser import PARSER_VERSION
+
+CACHE_FILENAME = "profile_cache.json"
+# leaderboard_latest.json, or .json.gz / .json.zst depending on the JSON compression
+LATEST_JSON_BASENAME = "leaderboard_latest"
+
+# Per-request tokens that change on every page load even when the profile itself
+# hasn't changed; stripped before hashing so unchanged profiles hash the same
+_VOLATILE_RE = re.compile(
+    r'<meta[^>]+name="csrf-(?:token|param)"[^>]*>'
+    r'|\snonce="[^"]*"'
+    r'|<input[^>]+name="authenticity_token"[^>]*>',
+    re.IGNORECASE,
+)
+
+def content_hash(html: str) -> str:
+    """
+    SHA-256 of the page body with volatile per-request tokens removed
+    """
+    return hashlib.sha256(_VOLATILE_RE.sub("", html).encode("utf-8")).hexdigest()
+
+class ProfileCache:
+    """
+    On-disk cache of profile responses keyed by profile URL.
+    Stores ETag / Last-Modified, a body hash and the parser version per profile. When
+    the server answers a conditional GET with 304, or the body hash matches the previous
+    run, the badge list from the previous leaderboard_latest.json is reused without
+    parsing, provided it was parsed by the current PARSER_VERSION.
+    """
+
+    def __init__(self, path: Path, previous_results: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logging.warning("Ignoring unreadable profile cache %s: %s", path, e)
+        # Only results that were scraped without error can be reused
+        self.badges_by_url = {
+            r.get("profile_url"): r.get("badges", [])
+            for r in previous_results or []
+            if r.get("profile_url") and not r.get("error")
+        }
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._saved = self._validators()
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path) -> "ProfileCache":
+        previous = []
+        latest = find_json(data_dir / LATEST_JSON_BASENAME)
+        if latest is not None:
+            try:
+                previous = read_json(latest).get("participants", [])
+            except Exception as e:
+                logging.warning("Could not load previous results from %s: %s", latest, e)
+        return cls(data_dir / CACHE_FILENAME, previous)
+
+    def cached_badges(self, url: str) -> Optional[List[Dict[str, str]]]:
+        entry = self.entries.get(url)
+        if entry is None or entry.get("parser_version") != PARSER_VERSION:
+            return None
+        return self.badges_by_url.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        If-None-Match / If-Modified-Since headers for a profile, only when a
+        304 could actually be served from the cache
+        """
+        entry = self.entries.get(url)
+        if not entry or self.cached_badges(url) is None:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidate(self, url: str, response) -> Optional[List[Dict[str, str]]]:
+        """
+        Record the response for `url` and return the cached badges if the profile
+        is unchanged (304, or a 200 whose body hash matches), else None
+        """
+        if response.status_code == 304:
+            badges = self.cached_badges(url)
+            if badges is not None:
+                with self._lock:
+                    self.hits += 1
+            return badges
+        if response.status_code != 200:
+            return None
+
+        body_hash = content_hash(response.text)
+        with self._lock:
+            previous = self.entries.get(url, {})
+            self.entries[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body_hash": body_hash,
+                "parser_version": PARSER_VERSION,
+                "fetched_at": datetime.now(timezone.utc).isoformat()
+            }
+            if (previous.get("body_hash") == body_hash and previous.get("parser_version") == PARSER_VERSION
+                    and url in self.badges_by_url):
+                self.hits += 1
+                return self.badges_by_url[url]
+        return None
+
+    def invalidate(self, url: str):
+        """
+        Forget a profile whose latest fetch failed, so stale badges are never reused
+        """
+        with self._lock:
+            self.entries.pop(url, None)
+
+    def _validators(self) -> Dict[str, tuple]:
+        """
+        What decides whether a cache entry is reused; fetched_at is left out, as it changes
+        on every fetch even when the profile doesn't
+        """
+        return {
+            url: (e.get("etag"), e.get("last_modified"), e.get("body_hash"), e.get("parser_version"))
+            for url, e in self.entries.items()
+        }
+
+    def save(self):
+        """
+        Write the cache, unless no profile's validators changed since it was loaded: the
+        file is committed with the data, so an unchanged run shouldn't touch it
+        """
+        validators = self._validators()
+        if validators == self._saved and self.path.exists():
+            logging.info("Profile cache unchanged, keeping %s", self.path)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        self._saved = validators
+        logging.info("Saved profile cache: %s (%d entries)", self.path, len(self.entries))
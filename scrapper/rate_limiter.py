@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all scraping workers.
+    Each outgoing request takes one token; tokens refill at `rate` per second
+    up to `capacity`, so short bursts are allowed but the long-run request
+    rate never exceeds `rate`. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        Block until `tokens` are available, then consume them
+        """
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    return
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        """
+        Change the refill rate, keeping the tokens accrued so far
+        """
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+
+class AdaptiveRateController:
+    """
+    AIMD (additive increase, multiplicative decrease) control of a TokenBucket's rate.
+    Every `window` healthy responses raise the rate by `increase` req/s, up to max_rate.
+    A retried request (429/5xx or connection error) or smoothed latency above
+    `latency_factor` times the baseline (and above min_latency seconds, so jitter on fast
+    responses doesn't count) multiplies it by `decrease`, down to min_rate.
+    Requests already in flight report the same congestion, so there is at most one
+    decrease per `cooldown` seconds.
+    """
+
+    # Weight of the newest sample in the smoothed latency
+    EWMA_ALPHA = 0.2
+    # The latency baseline is the lowest smoothed latency seen, creeping up by this factor
+    # per response so a lasting slowdown eventually becomes the new normal
+    BASELINE_DRIFT = 1.01
+
+    def __init__(self, bucket: TokenBucket, min_rate: float, max_rate: float, increase: float = 0.5,
+                 decrease: float = 0.5, window: int = 10, latency_factor: float = 2.0, min_latency: float = 0.5,
+                 cooldown: float = 5.0):
+        self.bucket = bucket
+        self.min_rate = min(min_rate, bucket.rate)
+        self.max_rate = max(max_rate, bucket.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.latency_factor = latency_factor
+        self.min_latency = min_latency
+        self.cooldown = cooldown
+        self.start_rate = self.low_rate = self.peak_rate = bucket.rate
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.increases = 0
+        self.decreases = 0
+        self._healthy = 0
+        self._ewma: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def _set_rate(self, rate: float):
+        self.bucket.set_rate(rate)
+        self.low_rate = min(self.low_rate, rate)
+        self.peak_rate = max(self.peak_rate, rate)
+
+    def _back_off(self, reason: str):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._healthy = 0
+        rate = max(self.min_rate, self.bucket.rate * self.decrease)
+        if rate < self.bucket.rate:
+            self.decreases += 1
+            logging.info("Rate limit %.2f -> %.2f req/s (%s)", self.bucket.rate, rate, reason)
+            self._set_rate(rate)
+
+    def record_retry(self, status: Optional[int]):
+        """
+        A request is being retried: status is the throttling/5xx status, or None for a connection error
+        """
+        with self._lock:
+            self.retries += 1
+            self._back_off(f"HTTP {status}" if status else "connection error")
+
+    def record_response(self, latency: float, status: int):
+        """
+        Final response of a request, with its latency in seconds
+        """
+        with self._lock:
+            self.latencies.append(latency)
+            self._ewma = latency if self._ewma is None else (1 - self.EWMA_ALPHA) * self._ewma + self.EWMA_ALPHA * latency
+            self._baseline = self._ewma if self._baseline is None else min(self._ewma, self._baseline * self.BASELINE_DRIFT)
+            if status == 429 or status >= 500:
+                # Already reported through record_retry
+                return
+            slow = self._ewma > max(self._baseline * self.latency_factor, self.min_latency)
+            if len(self.latencies) >= self.window and slow:
+                self._back_off(f"latency {self._ewma:.2f}s vs {self._baseline:.2f}s baseline")
+                return
+            self._healthy += 1
+            if self._healthy >= self.window:
+                self._healthy = 0
+                rate = min(self.max_rate, self.bucket.rate + self.increase)
+                if rate > self.bucket.rate:
+                    self.increases += 1
+                    self._set_rate(rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            def percentile(p: float) -> Optional[float]:
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+            return {
+                "rate": round(self.bucket.rate, 2),
+                "start_rate": round(self.start_rate, 2),
+                "low_rate": round(self.low_rate, 2),
+                "peak_rate": round(self.peak_rate, 2),
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "retries": self.retries,
+                "requests": len(latencies),
+                "latency_p50": percentile(0.5),
+                "latency_p95": percentile(0.95),
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        latency = (f"latency p50 {s['latency_p50']:.2f}s p95 {s['latency_p95']:.2f}s"
+                   if s["requests"] else "no requests")
+        return (f"rate {s['start_rate']:g} -> {s['rate']:g} req/s (range {s['low_rate']:g}-{s['peak_rate']:g}), "
+                f"{latency}, {s['retries']} retries")
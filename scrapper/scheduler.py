@@ -0,0 +1,129 @@
+import os
+import json
+import logging
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from scrapper.config import get_setting
+from scrapper.fingerprints import fingerprint
+from scrapper.processor import flatten_results, MAX_BADGES
+
+SCHEDULE_FILENAME = "schedule.json"
+
+# Each profile is refreshed every MIN..MAX hours depending on how much it moves:
+#   activity: hours since the last new badge (or any change) / 12, i.e. 2h per idle day
+#   rank:     MIN * rank / TOP_RANKS for participants with badges, so the top ranks get MIN
+#   never active: MAX
+# The shorter of the two wins. A failed scrape is retried after MIN, then backs off
+# doubling per consecutive failure.
+SCHEDULE_MIN_HOURS = float(os.getenv("SCHEDULE_MIN_HOURS", get_setting("scraper", "schedule_min_hours", 3)))
+SCHEDULE_MAX_HOURS = float(os.getenv("SCHEDULE_MAX_HOURS", get_setting("scraper", "schedule_max_hours", 72)))
+SCHEDULE_TOP_RANKS = int(os.getenv("SCHEDULE_TOP_RANKS", get_setting("scraper", "schedule_top_ranks", 20)))
+ACTIVITY_HOURS_PER_IDLE_DAY = 2
+# Runs don't start on the dot, so a profile due shortly after the run start is scraped now
+# rather than waiting a whole extra cron period
+DUE_SLACK = timedelta(minutes=30)
+
+def _parse(ts: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(ts) if ts else None
+
+def refresh_interval(now: datetime, last_activity: Optional[datetime], rank: Optional[int], failures: int) -> float:
+    """
+    Hours until a profile should be scraped again
+    """
+    if failures:
+        return min(SCHEDULE_MAX_HOURS, SCHEDULE_MIN_HOURS * 2 ** (failures - 1))
+    interval = SCHEDULE_MAX_HOURS
+    if last_activity is not None:
+        idle_days = max(0.0, (now - last_activity).total_seconds() / 86400)
+        interval = min(interval, idle_days * ACTIVITY_HOURS_PER_IDLE_DAY)
+    if rank is not None:
+        interval = min(interval, SCHEDULE_MIN_HOURS * rank / max(1, SCHEDULE_TOP_RANKS))
+    return round(min(SCHEDULE_MAX_HOURS, max(SCHEDULE_MIN_HOURS, interval)), 2)
+
+class ScrapeSchedule:
+    """
+    Per-profile refresh schedule (data/schedule.json), keyed by profile URL:
+      {"last_scraped", "last_changed", "last_earned", "rank", "failures",
+       "fingerprint", "interval_hours", "next_due"}
+    Profiles that aren't in the schedule yet are always due.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logging.warning("Ignoring unreadable scrape schedule %s: %s", path, e)
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path) -> "ScrapeSchedule":
+        return cls(data_dir / SCHEDULE_FILENAME)
+
+    def is_due(self, url: str, now: datetime) -> bool:
+        entry = self.entries.get(url)
+        if not entry or not entry.get("next_due"):
+            return True
+        return _parse(entry["next_due"]) <= now + DUE_SLACK
+
+    def due(self, participants: List[Dict[str, Any]], now: datetime) -> List[int]:
+        """
+        Indices of the participants due for a scrape at `now`
+        """
+        return [i for i, p in enumerate(participants) if self.is_due(p["profile_url"], now)]
+
+    def update(self, results: List[Dict[str, Any]], scraped: set, now: datetime):
+        """
+        Reschedule every participant after a run. `results` is the full leaderboard (ranks
+        depend on everyone); only the profile URLs in `scraped` were actually fetched, the
+        rest keep their last_scraped/next_due.
+        """
+        frame, _ = flatten_results(results, MAX_BADGES)
+        for r, rank, total, last_earned in zip(results, frame["rank"], frame["total_badges"], frame["last_earned_utc"]):
+            url = r.get("profile_url")
+            if not url:
+                continue
+            entry = self.entries.setdefault(url, {})
+            failed = bool(r.get("error"))
+            if not failed:
+                # Zero-badge participants tie at the bottom; their rank says nothing about activity
+                entry["rank"] = int(rank) if total else None
+            if url in scraped:
+                entry["last_scraped"] = now.isoformat()
+                if failed:
+                    # A failed fetch has no badges: keep the rank, fingerprint and activity it
+                    # had, so only the failure backoff decides when it's retried
+                    entry["failures"] = entry.get("failures", 0) + 1
+                else:
+                    entry["failures"] = 0
+                    fp = fingerprint(r)
+                    if entry.get("fingerprint") not in (None, fp):
+                        entry["last_changed"] = now.isoformat()
+                    entry["fingerprint"] = fp
+                    entry["last_earned"] = None if pd.isna(last_earned) else last_earned.isoformat()
+
+            activity = [t for t in (_parse(entry.get("last_earned")), _parse(entry.get("last_changed"))) if t is not None]
+            entry["interval_hours"] = refresh_interval(now, max(activity) if activity else None,
+                                                       entry.get("rank"), entry.get("failures", 0))
+            if entry.get("last_scraped"):
+                entry["next_due"] = (_parse(entry["last_scraped"]) + timedelta(hours=entry["interval_hours"])).isoformat()
+
+    def prune(self, participants: List[Dict[str, Any]]):
+        """
+        Drop profiles that are no longer in the participant list
+        """
+        current = {p["profile_url"] for p in participants}
+        for url in [u for u in self.entries if u not in current]:
+            del self.entries[url]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        intervals = [e["interval_hours"] for e in self.entries.values() if "interval_hours" in e]
+        logging.info("Saved scrape schedule: %s (%d profiles, %d refreshed every %gh)", self.path, len(self.entries),
+                     sum(1 for h in intervals if h <= SCHEDULE_MIN_HOURS), SCHEDULE_MIN_HOURS)
@@ -1,21 +1,66 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any
-import time
+from typing import List, Dict, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging
-import dateparser
-from pathlib import Path
 from tqdm import tqdm
 import os
+import time
+from scrapper.badge_parser import make_badge, dedupe_badges, parse_badges_fast, resolve_backend
+from scrapper.browser_pool import BrowserPool
+from scrapper.config import get_setting
+from scrapper.http_session import build_session
+from scrapper.profile_cache import ProfileCache
+from scrapper.archive import HtmlArchive
+from scrapper.rate_limiter import TokenBucket, AdaptiveRateController
+from scrapper.parse_pool import ParsePool, StageTimings
 
-REQUESTS_TIMEOUT = int(os.getenv("REQUESTS_TIMEOUT", "15"))
-SLEEP_SECONDS = float(os.getenv("SLEEP_SECONDS", "2"))
-USE_PLAYWRIGHT_FALLBACK = os.getenv("USE_PLAYWRIGHT_FALLBACK", "true").lower() in ("1","true","yes")
+# Environment variables override config/config.yaml
+REQUESTS_TIMEOUT = int(os.getenv("REQUESTS_TIMEOUT", get_setting("scraper", "requests_timeout", 15)))
+USE_PLAYWRIGHT_FALLBACK = str(os.getenv("USE_PLAYWRIGHT_FALLBACK", get_setting("scraper", "use_playwright_fallback", True))).lower() in ("1","true","yes")
+
+# Concurrency: number of profiles fetched in parallel, and a global request
+# rate shared by all workers (replaces the old fixed per-profile sleep)
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", get_setting("scraper", "max_workers", 8)))
+REQUESTS_PER_SECOND = float(os.getenv("REQUESTS_PER_SECOND", get_setting("scraper", "requests_per_second", 4)))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", get_setting("scraper", "rate_limit_burst", 2)))
+# Adaptive rate: start at REQUESTS_PER_SECOND, speed up while responses are fast and
+# healthy, back off on 429/5xx or rising latency (AIMD), staying within these bounds
+ADAPTIVE_RATE = str(os.getenv("ADAPTIVE_RATE", get_setting("scraper", "adaptive_rate", True))).lower() in ("1","true","yes")
+MIN_REQUESTS_PER_SECOND = float(os.getenv("MIN_REQUESTS_PER_SECOND", get_setting("scraper", "min_requests_per_second", 0.5)))
+MAX_REQUESTS_PER_SECOND = float(os.getenv("MAX_REQUESTS_PER_SECOND", get_setting("scraper", "max_requests_per_second", 12)))
+# Processes parsing fetched pages (0 = parse in the fetch threads; auto = up to 2, leaving a
+# core for the fetch threads) and pages sent to a process at a time
+PARSE_WORKERS = str(os.getenv("PARSE_WORKERS", get_setting("scraper", "parse_workers", "auto")))
+PARSE_WORKERS = max(0, min(2, (os.cpu_count() or 1) - 1)) if PARSE_WORKERS == "auto" else int(PARSE_WORKERS)
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", get_setting("scraper", "parse_chunk_size", 8)))
+# Number of browser tabs the Playwright fallback renders in parallel
+PLAYWRIGHT_TABS = int(os.getenv("PLAYWRIGHT_TABS", get_setting("scraper", "playwright_tabs", 4)))
+# HTML parser fast path: auto (selectolax, then lxml), selectolax, lxml or bs4 (BeautifulSoup only)
+PARSER_BACKEND = resolve_backend(os.getenv("PARSER_BACKEND", get_setting("scraper", "parser_backend", "auto")))
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+_rate_limiter = TokenBucket(REQUESTS_PER_SECOND, RATE_LIMIT_BURST)
+# A rate of 0 means unlimited, which there is nothing to adapt
+_rate_controller = (
+    AdaptiveRateController(_rate_limiter, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND)
+    if ADAPTIVE_RATE and REQUESTS_PER_SECOND > 0 else None
+)
+# Retries are sent from inside urllib3, so they take their rate limiter token there
+_session = build_session(pool_size=MAX_WORKERS, headers=HEADERS,
+                         on_retry=_rate_controller.record_retry if _rate_controller else None,
+                         before_retry=_rate_limiter.acquire)
+_timings = StageTimings()
+_browser_pool = BrowserPool(size=PLAYWRIGHT_TABS, user_agent=HEADERS["User-Agent"])
+
+class FetchError(Exception):
+    """
+    A profile page couldn't be fetched; the message says why (HTTP status, no response)
+    """
+
 def parse_badges_from_soup(soup: BeautifulSoup) -> List[Dict[str, str]]:
     """
     Inspect the Cloud Skills Boost public profile structure and extract badges.
@@ -39,29 +84,13 @@ def parse_badges_from_soup(soup: BeautifulSoup) -> List[Dict[str, str]]:
             
             # Extract earned date from span.ql-body-medium containing "Earned"
             date_el = badge_el.find("span", class_=lambda x: x and "ql-body-medium" in x)
-            date_text = None
-            if date_el:
-                date_text = date_el.get_text(strip=True)
-                # Clean up text like "Earned Oct 21, 2025 EDT" to just the date part
-                if "Earned" in date_text:
-                    date_text = date_text.replace("Earned", "").strip()
-            
-            # Parse the date
-            parsed_date = None
-            if date_text:
-                try:
-                    parsed_date = dateparser.parse(date_text)
-                except Exception as e:
-                    logging.debug("Failed to parse date '%s': %s", date_text, e)
+            date_text = date_el.get_text(strip=True) if date_el else None
             
             # Only add if we have a badge name
-            if badge_name and len(badge_name) > 3:
-                badges.append({
-                    "badge_name": badge_name,
-                    "earned_date_raw": date_text,
-                    "earned_date": parsed_date.isoformat() if parsed_date else None
-                })
-                logging.debug("Extracted badge: %s (earned: %s)", badge_name, date_text)
+            badge = make_badge(badge_name, date_text)
+            if badge:
+                badges.append(badge)
+                logging.debug("Extracted badge: %s (earned: %s)", badge_name, badge["earned_date_raw"])
     
     # Fallback: Try alternate selectors if profile-badge didn't work
     if not badges:
@@ -76,13 +105,9 @@ def parse_badges_from_soup(soup: BeautifulSoup) -> List[Dict[str, str]]:
                 # Extract any text that looks like a title
                 name_el = badge_el.find(["span", "h3", "h4", "div"], class_=lambda x: x and ("title" in str(x).lower() or "medium" in str(x).lower()))
                 if name_el:
-                    badge_name = name_el.get_text(strip=True)
-                    if badge_name and len(badge_name) > 3:
-                        badges.append({
-                            "badge_name": badge_name,
-                            "earned_date_raw": None,
-                            "earned_date": None
-                        })
+                    badge = make_badge(name_el.get_text(strip=True), None)
+                    if badge:
+                        badges.append(badge)
     
     # Another fallback: Look for ql-button elements with "Learn more" that are near badge info
     if not badges:
@@ -95,62 +120,66 @@ def parse_badges_from_soup(soup: BeautifulSoup) -> List[Dict[str, str]]:
                 # Look for title
                 name_el = parent.find("span", class_=lambda x: x and "title" in str(x).lower())
                 if name_el:
-                    badge_name = name_el.get_text(strip=True)
                     # Look for earned date
                     date_el = parent.find("span", class_=lambda x: x and "body" in str(x).lower())
-                    date_text = date_el.get_text(strip=True) if date_el else None
-                    if date_text and "Earned" in date_text:
-                        date_text = date_text.replace("Earned", "").strip()
-                    
-                    parsed_date = None
-                    if date_text:
-                        try:
-                            parsed_date = dateparser.parse(date_text)
-                        except:
-                            pass
-                    
-                    if badge_name and len(badge_name) > 3:
-                        badges.append({
-                            "badge_name": badge_name,
-                            "earned_date_raw": date_text,
-                            "earned_date": parsed_date.isoformat() if parsed_date else None
-                        })
+                    badge = make_badge(name_el.get_text(strip=True), date_el.get_text(strip=True) if date_el else None)
+                    if badge:
+                        badges.append(badge)
     
     # De-duplicate by badge_name + date
-    unique = []
-    seen = set()
-    for b in badges:
-        key = (b.get("badge_name"), b.get("earned_date_raw"))
-        if key not in seen:
-            unique.append(b)
-            seen.add(key)
+    unique = dedupe_badges(badges)
     
     logging.info("Extracted %d unique badges", len(unique))
     return unique
 
-def fetch_with_requests(url: str) -> str | None:
+def parse_badges_from_html(html: str, backend: str | None = None) -> List[Dict[str, str]]:
+    """
+    Extract badges from profile HTML. The compiled-selector fast path (selectolax or lxml)
+    handles the standard markup; the BeautifulSoup cascade runs only when it finds nothing.
+    """
+    backend = backend or PARSER_BACKEND
+    badges = parse_badges_fast(html, backend)
+    if badges:
+        logging.info("Extracted %d unique badges", len(badges))
+        return badges
+    
+    soup = BeautifulSoup(html, "html.parser")
+    return parse_badges_from_soup(soup)
+
+def fetch_response(url: str, headers: Dict[str, str] | None = None) -> requests.Response | None:
+    """
+    GET `url` through the shared session, returning the response whatever its status
+    """
     try:
-        r = requests.get(url, headers=HEADERS, timeout=REQUESTS_TIMEOUT)
-        if r.status_code == 200:
-            return r.text
-        logging.warning("Requests fetch non-200: %s -> %s", url, r.status_code)
-        return None
+        _rate_limiter.acquire()
+        r = _session.get(url, headers=headers, timeout=REQUESTS_TIMEOUT)
+        if _rate_controller is not None:
+            # elapsed covers the final attempt only, not retry backoff sleeps
+            _rate_controller.record_response(r.elapsed.total_seconds(), r.status_code)
+        return r
     except Exception as e:
         logging.exception("Requests fetch failed: %s", e)
         return None
 
+def rate_summary() -> str | None:
+    """
+    Request rate and latency seen by the adaptive rate controller, for the run log
+    """
+    return _rate_controller.summary() if _rate_controller is not None else None
+
+def fetch_with_requests(url: str) -> str | None:
+    r = fetch_response(url)
+    if r is None:
+        return None
+    if r.status_code == 200:
+        return r.text
+    logging.warning("Requests fetch non-200: %s -> %s", url, r.status_code)
+    return None
+
 def fetch_with_playwright(url: str) -> str | None:
     try:
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-            page = browser.new_page()
-            page.goto(url, timeout=30000)
-            # wait briefly for network to settle
-            page.wait_for_load_state("networkidle", timeout=10000)
-            content = page.content()
-            browser.close()
-            return content
+        _rate_limiter.acquire()
+        return _browser_pool.fetch(url)
     except ImportError:
         logging.warning("Playwright not installed, skipping fallback")
         return None
@@ -158,30 +187,189 @@ def fetch_with_playwright(url: str) -> str | None:
         logging.exception("Playwright fetch failed: %s", e)
         return None
 
-def scrape_profile_badges(profile_url: str) -> List[Dict[str, str]]:
+def fetch_profile(profile_url: str, cache: ProfileCache | None = None,
+                  archive: HtmlArchive | None = None) -> Tuple[List[Dict[str, str]] | None, str | None]:
     """
-    Returns a list of badges (badge_name, earned_date, earned_date_raw)
+    Network half of scrape_profile_badges: (None, html) when the page needs parsing,
+    else (cached badges, None) for an unchanged profile. Raises FetchError when the URL
+    is invalid or the profile couldn't be fetched. Every page received is archived.
     """
     if not profile_url or not profile_url.startswith("http"):
         logging.warning("Invalid profile URL: %s", profile_url)
-        return []
+        raise FetchError(f"invalid profile URL: {profile_url!r}")
     
     logging.debug("Scraping %s", profile_url)
-    html = fetch_with_requests(profile_url)
+    r = fetch_response(profile_url, cache.conditional_headers(profile_url) if cache else None)
+    if archive is not None and r is not None and r.status_code == 200 and r.text:
+        archive.put(profile_url, r.text)
+    
+    if cache is not None and r is not None:
+        cached = cache.revalidate(profile_url, r)
+        if cached is not None:
+            logging.debug("Profile unchanged, reusing %d cached badges: %s", len(cached), profile_url)
+            return cached, None
+    
+    html = None
+    if r is not None:
+        if r.status_code == 200:
+            html = r.text
+        else:
+            logging.warning("Requests fetch non-200: %s -> %s", profile_url, r.status_code)
     
     if not html and USE_PLAYWRIGHT_FALLBACK:
         logging.info("Requests failed or returned empty, trying Playwright for %s", profile_url)
         html = fetch_with_playwright(profile_url)
+        if archive is not None and html:
+            archive.put(profile_url, html)
     
     if not html:
         logging.error("Could not fetch profile: %s", profile_url)
-        return []
+        if cache is not None:
+            cache.invalidate(profile_url)
+        reason = "no response" if r is None else "empty page" if r.status_code == 200 else f"HTTP {r.status_code}"
+        if USE_PLAYWRIGHT_FALLBACK:
+            reason += ", Playwright fallback got no page"
+        raise FetchError(f"fetch failed: {reason}")
     
-    soup = BeautifulSoup(html, "html.parser")
-    badges = parse_badges_from_soup(soup)
-    return badges
+    return None, html
+
+def scrape_profile_badges(profile_url: str, cache: ProfileCache | None = None,
+                          archive: HtmlArchive | None = None) -> List[Dict[str, str]]:
+    """
+    Returns a list of badges (badge_name, earned_date, earned_date_raw)
+    With a cache, a conditional GET is issued and unchanged profiles return the
+    previous run's badges without being parsed. Raises FetchError when the profile
+    can't be fetched.
+    """
+    badges, html = fetch_profile(profile_url, cache, archive)
+    return badges if html is None else parse_badges_from_html(html)
+
+def timing_summary() -> str:
+    """
+    Fetch vs parse time of the last scrape, for the run log
+    """
+    return _timings.summary()
+
+def _result(p: Dict[str, str], badges: List[Dict[str, str]], error: str | None = None) -> Dict:
+    if error is None:
+        logging.info("Scraped %s: found %d badges", p.get("name"), len(badges))
+    return {
+        "name": p.get("name"),
+        "email": p.get("email"),
+        "profile_url": p.get("profile_url", ""),
+        "badges": badges,
+        "error": error
+    }
+
+def _fetch_participant(p: Dict[str, str], cache: ProfileCache | None = None,
+                      archive: HtmlArchive | None = None) -> Tuple[Dict | None, str | None]:
+    """
+    (result, None) when the profile is done without parsing, else (None, html)
+    """
+    url = p.get("profile_url", "")
+    start = time.perf_counter()
+    try:
+        badges, html = fetch_profile(url, cache, archive)
+    except FetchError as e:
+        # Already logged by fetch_profile; the error keeps the failure out of the journal's
+        # completed results, the fingerprints and the schedule
+        return _result(p, [], str(e)), None
+    except Exception as e:
+        logging.exception("Failed scraping %s", url)
+        return _result(p, [], str(e)), None
+    finally:
+        _timings.add("fetch", time.perf_counter() - start)
+    return (_result(p, badges), None) if html is None else (None, html)
 
-def scrape_profile_badges_for_list(participants: List[Dict[str, str]]) -> List[Dict]:
+def _parse_participant(p: Dict[str, str], html: str) -> Dict:
+    start = time.perf_counter()
+    try:
+        return _result(p, parse_badges_from_html(html))
+    except Exception as e:
+        logging.exception("Failed parsing %s", p.get("profile_url"))
+        return _result(p, [], str(e))
+    finally:
+        _timings.add("parse", time.perf_counter() - start)
+
+def _scrape_participant(p: Dict[str, str], cache: ProfileCache | None = None,
+                        archive: HtmlArchive | None = None) -> Dict:
+    result, html = _fetch_participant(p, cache, archive)
+    return result if html is None else _parse_participant(p, html)
+
+def iter_profile_badges(participants: List[Dict[str, str]], max_workers: int | None = None,
+                        cache: ProfileCache | None = None, parse_workers: int | None = None,
+                        archive: HtmlArchive | None = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Scrape participants concurrently and yield (index, result) pairs as each profile
+    completes, index being the participant's position in `participants`.
+    At most 2 * max_workers profiles are being fetched at once, so a consumer that stops
+    pulling also pauses the scrape.
+    Threads only fetch; with parse_workers > 0 the pages are parsed in that many processes
+    (PARSE_CHUNK_SIZE pages per task), otherwise in the fetching thread.
+    """
+    workers = max(1, max_workers or MAX_WORKERS)
+    parse_workers = PARSE_WORKERS if parse_workers is None else parse_workers
+    logging.info("Beginning scrape of %d profiles with %d workers (%.2f req/s), parsing %s", len(participants), workers,
+                 REQUESTS_PER_SECOND, f"in {parse_workers} processes" if parse_workers > 0 else "in the fetch threads")
+    _timings.reset()
+    
+    pending = iter(enumerate(participants))
+    fetching = {}
+    progress = tqdm(total=len(participants), desc="Scraping profiles")
+    parser = ParsePool(parse_workers, PARSE_CHUNK_SIZE, parse_badges_from_html) if parse_workers > 0 else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def submit_next():
+                item = next(pending, None)
+                if item is not None:
+                    i, p = item
+                    if parser is None:
+                        fetching[pool.submit(_scrape_participant, p, cache, archive)] = i
+                    else:
+                        fetching[pool.submit(_fetch_participant, p, cache, archive)] = i
+            
+            for _ in range(workers * 2):
+                submit_next()
+            while fetching or (parser is not None and (parser.futures or parser.buffered)):
+                if parser is not None and parser.buffered and (not fetching or len(parser.futures) < parser.workers):
+                    # A parse process is idle, or no more pages are coming: don't wait for a full chunk
+                    parser.flush()
+                waiting = list(fetching) + (list(parser.futures) if parser is not None else [])
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetching:
+                        i = fetching.pop(future)
+                        submit_next()
+                        if parser is None:
+                            progress.update(1)
+                            yield i, future.result()
+                            continue
+                        result, html = future.result()
+                        if html is None:
+                            progress.update(1)
+                            yield i, result
+                        else:
+                            parser.add(i, html)
+                    else:
+                        for i, badges, error, seconds in parser.collect(future):
+                            _timings.add("parse", seconds)
+                            progress.update(1)
+                            yield i, _result(participants[i], badges or [], error)
+    finally:
+        progress.close()
+        if parser is not None:
+            parser.close()
+        # Only running if some profile needed the JS fallback
+        _browser_pool.close()
+    
+    logging.info("Scrape timings: %s", _timings.summary())
+    if cache is not None:
+        logging.info("Profile cache: %d of %d profiles unchanged since last run", cache.hits, len(participants))
+    if _rate_controller is not None:
+        logging.info("Request %s", _rate_controller.summary())
+
+def scrape_profile_badges_for_list(participants: List[Dict[str, str]], max_workers: int | None = None,
+                                   cache: ProfileCache | None = None) -> List[Dict]:
     """
     Accepts list of participants (each with name,email,profile_url) and returns list of results:
     [
@@ -194,33 +382,12 @@ def scrape_profile_badges_for_list(participants: List[Dict[str, str]]) -> List[D
       },
       ...
     ]
+    Profiles are fetched concurrently by `max_workers` threads (default MAX_WORKERS),
+    throttled by the shared token bucket. Results keep the order of `participants`.
+    An optional ProfileCache skips re-parsing profiles that haven't changed.
+    Use iter_profile_badges to consume results as they complete instead.
     """
-    results = []
-    logging.info("Beginning scrape of %d profiles", len(participants))
-    
-    for p in tqdm(participants, desc="Scraping profiles"):
-        url = p.get("profile_url", "")
-        try:
-            badges = scrape_profile_badges(url)
-            results.append({
-                "name": p.get("name"),
-                "email": p.get("email"),
-                "profile_url": url,
-                "badges": badges,
-                "error": None
-            })
-            logging.info("Scraped %s: found %d badges", p.get("name"), len(badges))
-        except Exception as e:
-            logging.exception("Failed scraping %s", url)
-            results.append({
-                "name": p.get("name"),
-                "email": p.get("email"),
-                "profile_url": url,
-                "badges": [],
-                "error": str(e)
-            })
-        
-        # Rate limiting
-        time.sleep(SLEEP_SECONDS)
-    
+    results: List[Dict] = [None] * len(participants)
+    for i, result in iter_profile_badges(participants, max_workers, cache):
+        results[i] = result
     return results
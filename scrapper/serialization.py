@@ -0,0 +1,166 @@
+import os
+import gzip
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from scrapper.config import get_setting
+
+# Leaderboard JSON layout and compression, from env or the data: section of config.yaml
+#   format:      pretty (indent=2) | minified | normalized (badge/date dictionaries, row arrays)
+#   compression: none (.json) | gzip (.json.gz) | zstd (.json.zst, needs the zstandard package)
+JSON_FORMAT = os.getenv("JSON_FORMAT", get_setting("data", "json_format", "pretty")).lower()
+JSON_COMPRESSION = os.getenv("JSON_COMPRESSION", get_setting("data", "json_compression", "none")).lower()
+
+FORMATS = ("pretty", "minified", "normalized")
+SUFFIXES = {"none": ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+PARTICIPANT_FIELDS = ["name", "email", "profile_url", "error", "badges"]
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Leaderboard JSON with participants as arrays in PARTICIPANT_FIELDS order, and each
+    badge as [badge index, date index] into shared badge_names / dates ([raw, iso]) lists.
+    Profile URLs are stored without their common prefix; total_badges is dropped, it is
+    the badge count.
+    """
+    badge_index: Dict[Any, int] = {}
+    date_index: Dict[Any, int] = {}
+    urls = [p.get("profile_url") for p in data.get("participants", []) if p.get("profile_url") is not None]
+    prefix = os.path.commonprefix(urls)
+    prefix = prefix[:prefix.rfind("/") + 1]
+    participants = []
+    for p in data.get("participants", []):
+        badges = [
+            [
+                badge_index.setdefault(b.get("badge_name"), len(badge_index)),
+                date_index.setdefault((b.get("earned_date_raw"), b.get("earned_date")), len(date_index)),
+            ]
+            for b in p.get("badges", [])
+        ]
+        url = p.get("profile_url")
+        participants.append([p.get("name"), p.get("email"), url[len(prefix):] if url is not None else None, p.get("error"), badges])
+    return {
+        "format": "normalized",
+        "scraped_at": data.get("scraped_at"),
+        "total_participants": data.get("total_participants"),
+        "fields": PARTICIPANT_FIELDS,
+        "profile_url_prefix": prefix,
+        "badge_names": list(badge_index),
+        "dates": [list(d) for d in date_index],
+        "participants": participants,
+    }
+
+def denormalize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inverse of normalize
+    """
+    names, dates, prefix = data["badge_names"], data["dates"], data.get("profile_url_prefix", "")
+    participants = []
+    for name, email, profile_url, error, badges in data["participants"]:
+        participants.append({
+            "name": name,
+            "email": email,
+            "profile_url": prefix + profile_url if profile_url is not None else None,
+            "total_badges": len(badges),
+            "badges": [
+                {"badge_name": names[b], "earned_date_raw": dates[d][0], "earned_date": dates[d][1]}
+                for b, d in badges
+            ],
+            "error": error,
+        })
+    return {
+        "scraped_at": data.get("scraped_at"),
+        "total_participants": data.get("total_participants"),
+        "participants": participants,
+    }
+
+def dumps(data: Any, fmt: str = "minified") -> bytes:
+    """
+    Encode as UTF-8 JSON, with orjson when it's installed
+    """
+    if fmt == "normalized":
+        data = normalize(data)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if fmt == "pretty" else 0)
+    if fmt == "pretty":
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads(raw: bytes) -> Any:
+    """
+    Decode JSON written by dumps in any format, decompressing gzip/zstd bodies first
+    """
+    if raw[:2] == _GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    elif raw[:4] == _ZSTD_MAGIC:
+        zstd = _zstd()
+        if zstd is None:
+            raise ImportError("zstandard is required to read zstd-compressed JSON")
+        raw = zstd.ZstdDecompressor().decompressobj().decompress(raw)
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if isinstance(data, dict) and data.get("format") == "normalized":
+        data = denormalize(data)
+    return data
+
+def variants(base: Path) -> List[Path]:
+    """
+    Every file name data for base (a path without suffix) could have been written to
+    """
+    return [base.with_name(base.name + suffix) for suffix in SUFFIXES.values()]
+
+def find_json(base: Path) -> Optional[Path]:
+    """
+    The most recently written of base.json / base.json.gz / base.json.zst, if any
+    """
+    existing = [p for p in variants(base) if p.exists()]
+    return max(existing, key=lambda p: p.stat().st_mtime) if existing else None
+
+def read_json(path: Path) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def write_json(data: Any, base: Path, fmt: Optional[str] = None, compression: Optional[str] = None) -> Path:
+    """
+    Write data to base + the suffix for the compression, removing copies left in other
+    encodings, and return the path written
+    """
+    fmt = fmt or JSON_FORMAT
+    compression = compression or JSON_COMPRESSION
+    if fmt not in FORMATS:
+        logging.warning("Unknown JSON format %s, using pretty", fmt)
+        fmt = "pretty"
+    if compression == "zstd" and _zstd() is None:
+        logging.warning("zstandard not installed; compressing JSON with gzip instead")
+        compression = "gzip"
+    if compression not in SUFFIXES:
+        logging.warning("Unknown JSON compression %s, writing uncompressed", compression)
+        compression = "none"
+
+    body = dumps(data, fmt)
+    if compression == "gzip":
+        body = gzip.compress(body, mtime=0)
+    elif compression == "zstd":
+        body = _zstd().ZstdCompressor(level=10).compress(body)
+
+    path = base.with_name(base.name + SUFFIXES[compression])
+    with open(path, 'wb') as f:
+        f.write(body)
+    for stale in variants(base):
+        if stale != path and stale.exists():
+            stale.unlink()
+    return path
@@ -0,0 +1,87 @@
+import re
+import hashlib
+import logging
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple
+from scrapper.participants import normalize_profile_urls
+from scrapper.serialization import write_json, read_json, SUFFIXES
+
+# Shard files: <shard dir>/shard-<i>-of-<N>.json[.gz|.zst]
+#   {"shard": i, "shards": N, "scraped_at", "participants": [result, ...],
+#    "profile_cache": {profile_url: cache entry}}
+_SHARD_RE = re.compile(r"^shard-(\d+)-of-(\d+)\.json")
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    "i/N" -> (i, N), shards being numbered 1..N
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+def shard_keys(participants: List[Dict[str, Any]], count: int) -> List[int]:
+    """
+    Shard (1..count) of each participant: a hash of the normalized profile URL, so the
+    split only depends on who is in the sheet, not on row order or how URLs were typed
+    """
+    urls = normalize_profile_urls(pd.Series([p["profile_url"] for p in participants], dtype=object))
+    return [int(hashlib.sha256(url.encode("utf-8")).hexdigest()[:16], 16) % count + 1 for url in urls]
+
+def select_shard(participants: List[Dict[str, Any]], index: int, count: int) -> List[Dict[str, Any]]:
+    return [p for p, shard in zip(participants, shard_keys(participants, count)) if shard == index]
+
+def write_shard(shard_dir: Path, index: int, count: int, results: List[Dict[str, Any]],
+                cache_entries: Dict[str, Dict[str, Any]]) -> Path:
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    data = {
+        "shard": index,
+        "shards": count,
+        "scraped_at": datetime.now(timezone.utc).isoformat(),
+        "participants": results,
+        "profile_cache": cache_entries,
+    }
+    # Always minified: the normalized layout only knows the leaderboard fields
+    return write_json(data, shard_dir / f"shard-{index}-of-{count}", fmt="minified")
+
+def shard_files(shard_dir: Path) -> List[Path]:
+    if not shard_dir.exists():
+        return []
+    return sorted(p for p in shard_dir.iterdir() if _SHARD_RE.match(p.name) and p.name.endswith(tuple(SUFFIXES.values())))
+
+def load_shards(shard_dir: Path) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Results keyed by profile URL and profile cache entries from a complete set of shard
+    files. Raises ValueError when shards are missing or come from different splits.
+    """
+    files = shard_files(shard_dir)
+    if not files:
+        raise ValueError(f"No shard files in {shard_dir}")
+    counts = {int(_SHARD_RE.match(p.name).group(2)) for p in files}
+    if len(counts) != 1:
+        raise ValueError(f"Shard files in {shard_dir} come from different splits: {sorted(counts)} shards")
+    count = counts.pop()
+    found = {int(_SHARD_RE.match(p.name).group(1)) for p in files}
+    missing = sorted(set(range(1, count + 1)) - found)
+    if missing:
+        raise ValueError(f"Missing shard(s) {missing} of {count} in {shard_dir}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    cache_entries: Dict[str, Dict[str, Any]] = {}
+    for path in files:
+        data = read_json(path)
+        for r in data.get("participants", []):
+            results[r.get("profile_url")] = r
+        cache_entries.update(data.get("profile_cache", {}))
+        logging.info("Loaded shard %s/%s: %d results scraped at %s", data.get("shard"), data.get("shards"),
+                     len(data.get("participants", [])), data.get("scraped_at"))
+    return results, cache_entries
+
+def remove_shards(shard_dir: Path):
+    for path in shard_files(shard_dir):
+        path.unlink()
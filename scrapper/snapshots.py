@@ -0,0 +1,156 @@
+import json
+from typing import List, Dict, Any, Optional, Tuple
+from scrapper.processor import flatten_results
+
+# Snapshots are stored as a full keyframe every SNAPSHOT_KEYFRAME_INTERVAL runs, with deltas
+# against the previous snapshot in between:
+#   keyframe: {"type": "keyframe", "data": <leaderboard JSON>}
+#   delta:    {"type": "delta", "base": <previous snapshot id>, "keyframe": <keyframe id>,
+#              "scraped_at", "total_participants",
+#              "added": [participant, ...], "removed": [profile_url, ...],
+#              "changed": {profile_url: {"set": {field: value}, "badges_added": [...],
+#                                        "badges_removed": [[name, raw, date], ...]}
+#                                       or {"set": {...}, "badges": [...full list...]}},
+#              "order": [index, ...]  (only when the order isn't old order + added: the
+#                                      new order as positions in that default order),
+#              "rank_moves": {profile_url: [old rank or None, new rank]}}
+# Rows written before deltas existed hold the bare leaderboard JSON and read as keyframes.
+# rank_moves covers the added and changed participants whose rank changed, not everyone
+# they pushed down a place. It is informational: ranks follow from the badges, so
+# reconstruction ignores it.
+
+def _badge_key(b: Dict[str, Any]) -> Tuple:
+    return (b.get("badge_name"), b.get("earned_date_raw"), b.get("earned_date"))
+
+def _by_url(snapshot: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Participants keyed by profile URL, or None if a URL is listed twice
+    """
+    participants = snapshot.get("participants", [])
+    by_url = {p.get("profile_url"): p for p in participants}
+    return by_url if len(by_url) == len(participants) else None
+
+def _ranks(participants: List[Dict[str, Any]]) -> Dict[str, int]:
+    frame, _ = flatten_results(participants)
+    return dict(zip(frame["profile_url"], frame["rank"].astype(int)))
+
+def is_keyframe(payload: Dict[str, Any]) -> bool:
+    return payload.get("type") != "delta"
+
+def keyframe_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return payload["data"] if payload.get("type") == "keyframe" else payload
+
+def _participant_change(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    change: Dict[str, Any] = {}
+    fields = {k: new.get(k) for k in set(old) | set(new) if k != "badges" and old.get(k) != new.get(k)}
+    if fields:
+        change["set"] = fields
+
+    old_badges, new_badges = old.get("badges", []), new.get("badges", [])
+    if old_badges != new_badges:
+        old_keys = {_badge_key(b) for b in old_badges}
+        new_keys = {_badge_key(b) for b in new_badges}
+        added = [b for b in new_badges if _badge_key(b) not in old_keys]
+        kept = [b for b in old_badges if _badge_key(b) in new_keys]
+        # Profiles list the newest badges first, so gains normally land in front
+        if new_badges == added + kept:
+            change["badges_added"] = added
+            change["badges_removed"] = [list(_badge_key(b)) for b in old_badges if _badge_key(b) not in new_keys]
+        else:
+            change["badges"] = new_badges
+    return change or None
+
+def diff_snapshots(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The delta turning previous into current (without base/keyframe ids), or None if
+    either snapshot lists a profile twice and can only be stored as a keyframe
+    """
+    old, new = _by_url(previous), _by_url(current)
+    if old is None or new is None:
+        return None
+
+    delta: Dict[str, Any] = {
+        "type": "delta",
+        "scraped_at": current.get("scraped_at"),
+        "total_participants": current.get("total_participants"),
+        "added": [p for url, p in new.items() if url not in old],
+        "removed": [url for url in old if url not in new],
+        "changed": {},
+    }
+    for url, p in new.items():
+        if url in old:
+            change = _participant_change(old[url], p)
+            if change:
+                delta["changed"][url] = change
+
+    expected_order = [url for url in old if url in new] + [p.get("profile_url") for p in delta["added"]]
+    if list(new) != expected_order:
+        position = {url: i for i, url in enumerate(expected_order)}
+        delta["order"] = [position[url] for url in new]
+
+    old_ranks, new_ranks = _ranks(previous["participants"]), _ranks(current["participants"])
+    movers = [p.get("profile_url") for p in delta["added"]] + list(delta["changed"])
+    delta["rank_moves"] = {
+        url: [old_ranks.get(url), new_ranks[url]] for url in movers
+        if old_ranks.get(url) != new_ranks[url]
+    }
+    return delta
+
+def apply_delta(snapshot: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The snapshot after delta; the input snapshot is left untouched
+    """
+    participants = {p.get("profile_url"): p for p in snapshot.get("participants", [])}
+    for url in delta.get("removed", []):
+        participants.pop(url, None)
+
+    for url, change in delta.get("changed", {}).items():
+        p = {**participants[url], **change.get("set", {})}
+        if "badges" in change:
+            p["badges"] = change["badges"]
+        elif "badges_added" in change or "badges_removed" in change:
+            removed = {tuple(k) for k in change.get("badges_removed", [])}
+            p["badges"] = change.get("badges_added", []) + [b for b in p.get("badges", []) if _badge_key(b) not in removed]
+        participants[url] = p
+
+    for p in delta.get("added", []):
+        participants[p.get("profile_url")] = p
+
+    ordered = list(participants.values())
+    if delta.get("order"):
+        ordered = [ordered[i] for i in delta["order"]]
+    return {
+        "scraped_at": delta.get("scraped_at"),
+        "total_participants": delta.get("total_participants"),
+        "participants": ordered,
+    }
+
+def decode(row: Dict[str, Any]) -> Dict[str, Any]:
+    snapshot = row.get("snapshot")
+    return json.loads(snapshot) if isinstance(snapshot, str) else snapshot
+
+def reconstruct(rows: List[Dict[str, Any]], snapshot_id: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Materialize a snapshot from leaderboard_snapshot rows ({id, snapshot}) holding its
+    keyframe and every delta after it; the newest row if snapshot_id is None
+    """
+    by_id = {row["id"]: decode(row) for row in rows}
+    if not by_id:
+        return None
+    target = snapshot_id if snapshot_id is not None else max(by_id)
+
+    chain = []
+    current = target
+    while True:
+        payload = by_id.get(current)
+        if payload is None:
+            raise KeyError(f"Snapshot {current} needed to rebuild {target} is missing")
+        if is_keyframe(payload):
+            break
+        chain.append(payload)
+        current = payload["base"]
+
+    snapshot = keyframe_data(payload)
+    for delta in reversed(chain):
+        snapshot = apply_delta(snapshot, delta)
+    return snapshot
@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import logging
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+from scrapper.config import get_setting
+
+# Static leaderboard served by the frontend's CDN (Vercel copies frontend/public into the build)
+STATIC_BUNDLE_DIR = Path(os.getenv("STATIC_BUNDLE_DIR", get_setting("data", "static_bundle_dir", "frontend/public/leaderboard")))
+STATIC_PAGE_SIZE = int(os.getenv("STATIC_PAGE_SIZE", get_setting("data", "static_page_size", 100)))
+STATIC_TOP_N = int(os.getenv("STATIC_TOP_N", get_setting("data", "static_top_n", 10)))
+POINTER_FILENAME = "latest.json"
+
+ROW_FIELDS = ["rank", "full_name", "email", "total_badges", "profile_url"]
+
+def _compact(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _write_hashed(out_dir: Path, stem: str, data: Any) -> str:
+    """
+    Write data to <stem>.<content hash>.json, so a file name always means the same
+    bytes and can be cached forever; returns the file name
+    """
+    body = _compact(data)
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}.json"
+    path = out_dir / name
+    if not path.exists():
+        path.write_bytes(body)
+    return name
+
+def _pointer_files(pointer: Dict[str, Any]) -> List[str]:
+    return [pointer.get("full"), pointer.get("top")] + list(pointer.get("pages", []))
+
+def build_static_bundle(summary_df: pd.DataFrame, out_dir: Optional[Path] = None,
+                        page_size: Optional[int] = None, top_n: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Write the ranked leaderboard (processor.build_and_save_csvs summary) as static files:
+      full.<hash>.json        every participant, as rows of ROW_FIELDS
+      top.<hash>.json         the first top_n
+      page-N.<hash>.json      page_size participants per page
+      latest.json             pointer to the above plus headline stats; the only file
+                              that changes in place, so it is the only one served with a short TTL
+    Files from the previous version are kept so clients holding the old pointer can
+    still load it; anything older is removed. Returns the pointer.
+    """
+    out_dir = out_dir or STATIC_BUNDLE_DIR
+    page_size = page_size or STATIC_PAGE_SIZE
+    top_n = top_n or STATIC_TOP_N
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    ranked = summary_df.sort_values("rank") if "rank" in summary_df else summary_df
+    counts = ranked["total_badges"].fillna(0).astype(int) if len(ranked) else pd.Series(dtype=int)
+    rows = [
+        [int(rank), name, email, int(total), url]
+        for rank, name, email, total, url in zip(
+            ranked.get("rank", []), ranked.get("name", []), ranked.get("email", []), counts, ranked.get("profile_url", [])
+        )
+    ]
+
+    pointer_path = out_dir / POINTER_FILENAME
+    previous: Dict[str, Any] = {}
+    if pointer_path.exists():
+        try:
+            previous = json.loads(pointer_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logging.warning("Ignoring unreadable static bundle pointer %s: %s", pointer_path, e)
+
+    pages = [
+        _write_hashed(out_dir, f"page-{i // page_size + 1}", {"fields": ROW_FIELDS, "rows": rows[i:i + page_size]})
+        for i in range(0, len(rows), page_size)
+    ]
+    pointer = {
+        "fields": ROW_FIELDS,
+        "total_participants": len(rows),
+        "total_badges": int(counts.sum()),
+        "active_participants": int((counts > 0).sum()),
+        "page_size": page_size,
+        "full": _write_hashed(out_dir, "full", {"fields": ROW_FIELDS, "rows": rows}),
+        "top": _write_hashed(out_dir, "top", {"fields": ROW_FIELDS, "rows": rows[:top_n]}),
+        "pages": pages,
+    }
+    # The version only depends on the content, so an unchanged leaderboard keeps its pointer
+    pointer["version"] = hashlib.sha256(_compact(pointer)).hexdigest()[:12]
+    if previous.get("version") == pointer["version"]:
+        logging.info("Static leaderboard unchanged (version %s)", pointer["version"])
+        return previous
+    pointer["generated_at"] = datetime.now(timezone.utc).isoformat()
+    pointer["previous"] = _pointer_files(previous) if previous else []
+
+    tmp = pointer_path.with_name(POINTER_FILENAME + ".tmp")
+    tmp.write_bytes(_compact(pointer))
+    tmp.replace(pointer_path)
+
+    keep = set(_pointer_files(pointer)) | set(pointer["previous"]) | {POINTER_FILENAME}
+    for path in out_dir.glob("*.json"):
+        if path.name not in keep:
+            path.unlink()
+
+    logging.info("Saved static leaderboard %s: %d participants in %d pages (%s)",
+                 pointer["version"], len(rows), len(pages), out_dir)
+    return pointer
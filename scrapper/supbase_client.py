@@ -4,12 +4,49 @@ from supabase import create_client, Client
 from typing import List, Dict, Any, Tuple
 from datetime import datetime, timezone
 import json
+from scrapper.config import get_setting
+from scrapper import snapshots
+
+MAX_BADGES = 19
+# Rows per bulk request; keeps payloads and `in` filters in the URL well under server limits
+BATCH_SIZE = int(os.getenv("SUPABASE_BATCH_SIZE", get_setting("scraper", "batch_size", 50)))
+BADGE_BATCH_SIZE = int(os.getenv("SUPABASE_BADGE_BATCH_SIZE", "500"))
+RANK_BATCH_SIZE = 1000
+# PostgREST returns at most 1000 rows per request by default
+PAGE_SIZE = 1000
+# Deltas stored between full leaderboard snapshots
+SNAPSHOT_KEYFRAME_INTERVAL = int(os.getenv("SNAPSHOT_KEYFRAME_INTERVAL", get_setting("supabase", "snapshot_keyframe_interval", 24)))
+
+def _chunks(items: List[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _capped_badges(r: Dict[str, Any]) -> List[Dict[str, Any]]:
+    badges = r.get("badges", [])
+    if len(badges) > MAX_BADGES:
+        logging.info("Participant %s has %d badges, capping at %d", r.get("name"), len(badges), MAX_BADGES)
+        badges = badges[:MAX_BADGES]
+    return badges
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    """
+    Parse an ISO timestamp from the database; naive values are taken as UTC
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 class SupabaseClient:
     def __init__(self, url: str, key: str):
         self.url = url
         self.key = key
         self.client: Client = create_client(url, key)
+        # Added/removed/unchanged counts from the most recent bulk badge sync
+        self.last_badge_sync: Dict[str, int] = {}
         logging.info("Supabase client initialized")
 
     def create_run(self, total_profiles: int) -> str:
@@ -52,15 +89,197 @@ class SupabaseClient:
         except Exception as e:
             logging.exception("Error updating run record: %s", e)
 
-    def upsert_participants_and_badges(self, results: List[Dict[str, Any]]) -> Tuple[int, int]:
+    def upsert_participants_and_badges(self, results: List[Dict[str, Any]], bulk: bool = True,
+                                       update_ranks: bool = True) -> Tuple[int, int]:
         """
         For each participant result:
           - Upsert into participants table (match by profile_url)
           - Delete existing badges for participant (if any)
           - Insert new badges
+        In bulk mode (default) this is done with chunked batch requests for all
+        participants at once, and badges are diffed against the stored rows so only
+        added/removed badges are written (see last_badge_sync for the counts).
+        Pass update_ranks=False when pushing in several batches and call update_ranks() once at the end.
         
         Returns (success_count, failure_count)
         """
+        if bulk:
+            success_count, failure_count = self._upsert_participants_bulk(results)
+        else:
+            success_count, failure_count = self._upsert_participants_individually(results)
+        
+        # Update ranks after all participants are processed
+        if update_ranks:
+            try:
+                self.update_ranks()
+            except Exception as e:
+                logging.exception("Failed to update ranks: %s", e)
+        
+        logging.info("Finished pushing to Supabase. Success: %d, Failures: %d", success_count, failure_count)
+        return success_count, failure_count
+
+    def _upsert_participants_bulk(self, results: List[Dict[str, Any]]) -> Tuple[int, int]:
+        failure_count = 0
+        now = datetime.now(timezone.utc).isoformat()
+        
+        # One row per profile URL; a URL listed twice keeps its last result, as the
+        # sequential sync would, and both input rows share its outcome
+        rows: Dict[str, Dict[str, Any]] = {}
+        badges_by_url: Dict[str, List[Dict[str, Any]]] = {}
+        row_counts: Dict[str, int] = {}
+        for r in results:
+            profile_url = r.get("profile_url", "")
+            if not profile_url:
+                logging.warning("Skipping participant with no profile URL")
+                failure_count += 1
+                continue
+            badges = _capped_badges(r)
+            rows[profile_url] = {
+                "full_name": r.get("name"),
+                "email": r.get("email"),
+                "profile_url": profile_url,
+                "last_scraped": now,
+                "total_badges": len(badges),
+                "updated_at": now
+            }
+            badges_by_url[profile_url] = badges
+            row_counts[profile_url] = row_counts.get(profile_url, 0) + 1
+        
+        # 1. Upsert participants, collecting ids from the returned rows
+        ids, failed_urls = self._bulk_upsert_participants(list(rows.values()))
+        
+        # 2. Resolve any ids the upsert didn't return in one query per chunk
+        missing = [url for url in rows if url not in ids and url not in failed_urls]
+        if missing:
+            ids.update(self._participant_ids(missing))
+        for url in rows:
+            if url not in ids and url not in failed_urls:
+                logging.error("Could not determine participant id for %s", url)
+                failed_urls.add(url)
+        
+        # 3. Apply only the badge changes since the last sync
+        synced = {url: ids[url] for url in rows if url not in failed_urls}
+        failed_ids = self._sync_badges({pid: badges_by_url[url] for url, pid in synced.items()})
+        
+        success_count = 0
+        for url, count in row_counts.items():
+            if url in synced and synced[url] not in failed_ids:
+                success_count += count
+            else:
+                failure_count += count
+        
+        logging.info("Bulk synced %d participants in chunks of %d", success_count, BATCH_SIZE)
+        return success_count, failure_count
+
+    def _bulk_upsert_participants(self, rows: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], set]:
+        """
+        Upsert participant rows in chunks and return ({profile_url: id}, failed profile_urls).
+        A failing chunk is retried row by row so one bad row doesn't fail its neighbours.
+        """
+        ids = {}
+        failed_urls = set()
+        for chunk in _chunks(rows, BATCH_SIZE):
+            try:
+                resp = self.client.table("participants").upsert(chunk, on_conflict="profile_url").execute()
+                for p in resp.data or []:
+                    ids[p.get("profile_url")] = p.get("id")
+                continue
+            except Exception as e:
+                logging.warning("Bulk participant upsert failed (%s), retrying %d rows individually", e, len(chunk))
+            for row in chunk:
+                try:
+                    resp = self.client.table("participants").upsert(row, on_conflict="profile_url").execute()
+                    if resp.data:
+                        ids[row["profile_url"]] = resp.data[0].get("id")
+                except Exception as e:
+                    logging.exception("Failed to process participant %s: %s", row["profile_url"], e)
+                    failed_urls.add(row["profile_url"])
+        return ids, failed_urls
+
+    def _participant_ids(self, profile_urls: List[str]) -> Dict[str, Any]:
+        ids = {}
+        for chunk in _chunks(profile_urls, BATCH_SIZE):
+            try:
+                q = self.client.table("participants").select("id, profile_url").in_("profile_url", chunk).execute()
+                for p in q.data or []:
+                    ids[p.get("profile_url")] = p.get("id")
+            except Exception as e:
+                logging.exception("Failed to look up participant ids: %s", e)
+        return ids
+
+    def _sync_badges(self, badges_by_id: Dict[Any, List[Dict[str, Any]]]) -> set:
+        """
+        Bring each participant's badges in line with the scraped list by diffing against
+        the stored rows (paged bulk reads per chunk): only new badges are inserted and only
+        removed ones deleted, so unchanged participants cause no writes at all.
+        Counts are kept in self.last_badge_sync. Returns the set of participant ids whose
+        badges could not be synced.
+        """
+        failed_ids = set()
+        existing: Dict[Any, List[Dict[str, Any]]] = {pid: [] for pid in badges_by_id}
+        for chunk in _chunks(list(badges_by_id), BATCH_SIZE):
+            try:
+                # Paged: a participant can have more stored rows than MAX_BADGES (duplicates, older runs)
+                for b in self._select_all("badges", "id, participant_id, badge_name, raw_date_text, earned_date",
+                                          ("participant_id", chunk)):
+                    existing[b["participant_id"]].append(b)
+            except Exception as e:
+                logging.exception("Failed to read existing badges for %d participants: %s", len(chunk), e)
+                failed_ids.update(chunk)
+        
+        to_delete = []
+        to_insert = []
+        unchanged = 0
+        for participant_id, badges in badges_by_id.items():
+            if participant_id in failed_ids:
+                continue
+            stored: Dict[Tuple, List[Any]] = {}
+            # Dates are compared as instants: Postgres returns the timestamptz normalized
+            # (e.g. "+00:00" for "Z"), never the string that was inserted
+            for b in existing[participant_id]:
+                key = (b.get("badge_name"), b.get("raw_date_text"), _parse_timestamp(b.get("earned_date")))
+                stored.setdefault(key, []).append(b["id"])
+            added = 0
+            for b in badges:
+                key = (b.get("badge_name"), b.get("earned_date_raw"), _parse_timestamp(b.get("earned_date")))
+                if stored.get(key):
+                    stored[key].pop()
+                    continue
+                to_insert.append({
+                    "participant_id": participant_id,
+                    "badge_name": b.get("badge_name"),
+                    "raw_date_text": b.get("earned_date_raw"),
+                    "earned_date": b.get("earned_date")  # iso string or None
+                })
+                added += 1
+            removed = [badge_id for ids in stored.values() for badge_id in ids]
+            to_delete.extend((badge_id, participant_id) for badge_id in removed)
+            if not added and not removed:
+                unchanged += 1
+        
+        for chunk in _chunks(to_delete, BADGE_BATCH_SIZE):
+            try:
+                self.client.table("badges").delete().in_("id", [badge_id for badge_id, _ in chunk]).execute()
+            except Exception as e:
+                logging.exception("Failed to delete %d removed badges: %s", len(chunk), e)
+                failed_ids.update(pid for _, pid in chunk)
+        
+        for chunk in _chunks(to_insert, BADGE_BATCH_SIZE):
+            try:
+                self.client.table("badges").insert(chunk).execute()
+            except Exception as e:
+                logging.exception("Failed to insert %d badges: %s", len(chunk), e)
+                failed_ids.update(b["participant_id"] for b in chunk)
+        
+        self.last_badge_sync = {"added": len(to_insert), "removed": len(to_delete), "unchanged": unchanged}
+        logging.info("Badge sync: %d added, %d removed, %d of %d participants unchanged",
+                     len(to_insert), len(to_delete), unchanged, len(badges_by_id))
+        return failed_ids
+
+    def _upsert_participants_individually(self, results: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Per-participant sync (several round trips each); used when bulk mode is disabled
+        """
         success_count = 0
         failure_count = 0
         
@@ -72,21 +291,9 @@ class SupabaseClient:
                 continue
             
             try:
-                # Compute rank and total badges
-                badges = r.get("badges", [])
-                
-                # Cap badges at maximum of 19
-                MAX_BADGES = 19
-                if len(badges) > MAX_BADGES:
-                    logging.info("Participant %s has %d badges, capping at %d", r.get("name"), len(badges), MAX_BADGES)
-                    badges = badges[:MAX_BADGES]
-                
+                badges = _capped_badges(r)
                 total_badges = len(badges)
                 
-                # Get last earned date
-                earned_dates = [b.get("earned_date") for b in badges if b.get("earned_date")]
-                last_earned = max(earned_dates) if earned_dates else None
-                
                 participant = {
                     "full_name": r.get("name"),
                     "email": r.get("email"),
@@ -118,7 +325,7 @@ class SupabaseClient:
                     continue
 
                 # Delete old badges for this participant (we'll re-insert)
-                del_resp = self.client.table("badges").delete().eq("participant_id", participant_id).execute()
+                self.client.table("badges").delete().eq("participant_id", participant_id).execute()
                 logging.debug("Deleted old badges for participant %s", participant_id)
 
                 # Insert new badges
@@ -133,7 +340,7 @@ class SupabaseClient:
                     badges_to_insert.append(rec)
                 
                 if badges_to_insert:
-                    ins = self.client.table("badges").insert(badges_to_insert).execute()
+                    self.client.table("badges").insert(badges_to_insert).execute()
                     logging.debug("Inserted %d badges for participant %s", len(badges_to_insert), participant_id)
 
                 # Update participant with computed fields
@@ -151,42 +358,164 @@ class SupabaseClient:
                 logging.exception("Failed to process participant %s: %s", profile_url, e)
                 failure_count += 1
         
-        # Update ranks after all participants are processed
-        try:
-            self._update_ranks()
-        except Exception as e:
-            logging.exception("Failed to update ranks: %s", e)
-        
-        logging.info("Finished pushing to Supabase. Success: %d, Failures: %d", success_count, failure_count)
         return success_count, failure_count
 
-    def _update_ranks(self):
+    def _select_all(self, table: str, columns: str, in_filter: Tuple[str, List[Any]] | None = None) -> List[Dict[str, Any]]:
         """
-        Update rank for all participants based on total_badges (desc) and last_earned (asc for ties)
+        Select every row of a table, or those whose in_filter column is one of its values,
+        paging past the server's max-rows limit
+        """
+        rows = []
+        start = 0
+        while True:
+            query = self.client.table(table).select(columns)
+            if in_filter is not None:
+                query = query.in_(*in_filter)
+            resp = query.order("id").range(start, start + PAGE_SIZE - 1).execute()
+            page = resp.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def update_ranks(self):
+        """
+        Update rank for all participants based on total_badges (desc) and last earned badge
+        date (asc for ties, participants without dates last), then profile_url, the same
+        order as processor.build_and_save_csvs. Ranks are computed locally from two bulk reads and
+        written back in a single upsert of the rows whose rank changed.
         """
         try:
-            # Fetch all participants ordered by badges desc, last_earned asc
-            resp = self.client.table("participants").select("id, total_badges, last_scraped").order("total_badges", desc=True).order("last_scraped", desc=False).execute()
+            participants = self._select_all("participants", "id, full_name, email, profile_url, total_badges, rank")
+            if not participants:
+                return
+            
+            last_earned: Dict[Any, datetime] = {}
+            for b in self._select_all("badges", "id, participant_id, earned_date"):
+                earned = _parse_timestamp(b.get("earned_date"))
+                pid = b.get("participant_id")
+                if earned and (pid not in last_earned or earned > last_earned[pid]):
+                    last_earned[pid] = earned
+            
+            ranked = sorted(participants, key=lambda p: (
+                -(p.get("total_badges") or 0),
+                last_earned.get(p["id"], datetime.max.replace(tzinfo=timezone.utc)),
+                p.get("profile_url") or ""
+            ))
             
-            if resp.data:
-                rank = 1
-                for p in resp.data:
-                    self.client.table("participants").update({"rank": rank}).eq("id", p["id"]).execute()
-                    rank += 1
-                logging.info("Updated ranks for %d participants", len(resp.data))
+            changed = []
+            for rank, p in enumerate(ranked, start=1):
+                if p.get("rank") != rank:
+                    # Send the NOT NULL columns too so the upsert's insert path validates
+                    changed.append({**p, "rank": rank})
+            
+            for chunk in _chunks(changed, RANK_BATCH_SIZE):
+                self.client.table("participants").upsert(chunk, on_conflict="id").execute()
+            logging.info("Updated ranks for %d participants (%d changed)", len(ranked), len(changed))
         except Exception as e:
             logging.exception("Error updating ranks: %s", e)
 
+    def publish_leaderboard_stats(self):
+        """
+        Precompute what the frontend shows and store it in the single row (id 1) of
+        leaderboard_stats (id int primary key, updated_at timestamptz, stats jsonb,
+        leaderboard jsonb), so a page load reads one row instead of the participants table:
+          stats: total/active participants, total/average/max badges, a histogram of
+                 badge counts (index = number of badges) and per-badge completion counts
+          leaderboard: [{id, rank, full_name, email, total_badges, profile_url}] by rank
+        """
+        try:
+            participants = self._select_all("participants", "id, full_name, email, profile_url, total_badges, rank")
+            completions: Dict[str, set] = {}
+            for b in self._select_all("badges", "id, participant_id, badge_name"):
+                completions.setdefault(b.get("badge_name"), set()).add(b.get("participant_id"))
+            
+            counts = [p.get("total_badges") or 0 for p in participants]
+            histogram = [0] * (max(counts + [MAX_BADGES]) + 1)
+            for c in counts:
+                histogram[c] += 1
+            total_badges = sum(counts)
+            
+            stats = {
+                "total_participants": len(participants),
+                "active_participants": sum(1 for c in counts if c > 0),
+                "total_badges": total_badges,
+                "average_badges": round(total_badges / len(participants), 1) if participants else 0,
+                "max_badges": max(counts, default=0),
+                "badge_histogram": histogram,
+                "badge_completions": sorted(
+                    ({"badge_name": name, "participants": len(ids)} for name, ids in completions.items() if name),
+                    key=lambda c: (-c["participants"], c["badge_name"])
+                )
+            }
+            leaderboard = sorted(
+                ({k: p.get(k) for k in ("id", "rank", "full_name", "email", "total_badges", "profile_url")} for p in participants),
+                key=lambda p: (p["rank"] is None, p["rank"] or 0)
+            )
+            
+            self.client.table("leaderboard_stats").upsert({
+                "id": 1,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "stats": stats,
+                "leaderboard": leaderboard
+            }, on_conflict="id").execute()
+            logging.info("Published leaderboard stats: %d participants, %d badges", len(participants), total_badges)
+        except Exception as e:
+            logging.exception("Error publishing leaderboard stats: %s", e)
+
+    def _snapshot_rows(self, snapshot_id: Any = None) -> List[Dict[str, Any]]:
+        """
+        leaderboard_snapshot rows from the keyframe of a snapshot (the newest if
+        snapshot_id is None) up to that snapshot, oldest first
+        """
+        query = self.client.table("leaderboard_snapshot").select("id, snapshot")
+        if snapshot_id is not None:
+            query = query.eq("id", snapshot_id)
+        target = query.order("id", desc=True).limit(1).execute().data
+        if not target:
+            return []
+        payload = snapshots.decode(target[0])
+        keyframe_id = target[0]["id"] if snapshots.is_keyframe(payload) else payload["keyframe"]
+        return (
+            self.client.table("leaderboard_snapshot").select("id, snapshot")
+            .gte("id", keyframe_id).lte("id", target[0]["id"]).order("id").execute().data
+        )
+
     def save_leaderboard_snapshot(self, snapshot_data: Dict):
         """
-        Save a snapshot of the leaderboard to leaderboard_snapshot table
+        Save a snapshot of the leaderboard to leaderboard_snapshot table, as a delta against
+        the previous snapshot or, every SNAPSHOT_KEYFRAME_INTERVAL snapshots, in full
+        (see scrapper.snapshots for the format)
         """
         try:
+            payload = None
+            try:
+                rows = self._snapshot_rows()
+                if rows and len(rows) <= SNAPSHOT_KEYFRAME_INTERVAL:
+                    delta = snapshots.diff_snapshots(snapshots.reconstruct(rows), snapshot_data)
+                    if delta is not None:
+                        payload = {**delta, "base": rows[-1]["id"], "keyframe": rows[0]["id"]}
+            except Exception as e:
+                logging.warning("Could not diff against the previous snapshot, saving a keyframe: %s", e)
+            if payload is None:
+                payload = {"type": "keyframe", "data": snapshot_data}
+            
+            body = json.dumps(payload)
             snapshot = {
                 "created_at": datetime.now(timezone.utc).isoformat(),
-                "snapshot": json.dumps(snapshot_data)
+                "snapshot": body
             }
             self.client.table("leaderboard_snapshot").insert(snapshot).execute()
-            logging.info("Saved leaderboard snapshot")
+            logging.info("Saved leaderboard snapshot (%s, %d bytes)", payload["type"], len(body))
         except Exception as e:
             logging.exception("Error saving leaderboard snapshot: %s", e)
+
+    def load_leaderboard_snapshot(self, snapshot_id: Any = None) -> Dict | None:
+        """
+        Rebuild a stored snapshot (the newest if snapshot_id is None) from its keyframe and deltas
+        """
+        try:
+            return snapshots.reconstruct(self._snapshot_rows(snapshot_id), snapshot_id)
+        except Exception as e:
+            logging.exception("Error loading leaderboard snapshot %s: %s", snapshot_id, e)
+            return None
@@ -1,23 +1,76 @@
+import re
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 import dateparser
 
-def parse_date(date_string: str) -> Optional[str]:
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+# UTC offsets (hours) for the abbreviations Cloud Skills Boost prints, matching what
+# dateparser returns for them. Ambiguous ones (e.g. IST) are left to dateparser.
+TZ_OFFSETS = {
+    "UTC": 0, "GMT": 0, "BST": 1, "CET": 1, "CEST": 2,
+    "EST": -5, "EDT": -4, "CST": -6, "CDT": -5, "MST": -7, "MDT": -6,
+    "PST": -8, "PDT": -7, "AKST": -9, "AKDT": -8, "HST": -10,
+    "SGT": 8, "JST": 9, "AEST": 10, "AEDT": 11,
+}
+_TZINFOS = {abbr: timezone(timedelta(hours=hours)) for abbr, hours in TZ_OFFSETS.items()}
+
+# "Oct 22, 2025 EDT" / "October 22, 2025"
+_EARNED_DATE_RE = re.compile(r"^([A-Za-z]+)\.? (\d{1,2}), (\d{4})(?: ([A-Z]{2,5}))?$")
+
+def _parse_known_format(date_string: str) -> Optional[datetime]:
+    m = _EARNED_DATE_RE.match(date_string)
+    if not m:
+        return None
+    month_name, day, year, tz_abbr = m.groups()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+    tzinfo = None
+    if tz_abbr:
+        tzinfo = _TZINFOS.get(tz_abbr)
+        if tzinfo is None:
+            return None
+    try:
+        return datetime(int(year), month, int(day), tzinfo=tzinfo)
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def parse_earned_date(date_string: str) -> Optional[datetime]:
     """
-    Parse a date string and return ISO format string, or None if parsing fails
+    Parse a badge "earned" date such as "Oct 22, 2025 EDT".
+    The known Cloud Skills Boost format is parsed directly; anything else falls back
+    to dateparser. Results are memoized by raw string since most badges share a
+    handful of dates.
     """
     if not date_string:
         return None
     
+    date_string = date_string.strip()
+    parsed = _parse_known_format(date_string)
+    if parsed is not None:
+        return parsed
+    
     try:
-        parsed = dateparser.parse(date_string)
-        if parsed:
-            return parsed.isoformat()
+        return dateparser.parse(date_string)
     except Exception as e:
         logging.debug("Failed to parse date '%s': %s", date_string, e)
-    
-    return None
+        return None
+
+def parse_date(date_string: str) -> Optional[str]:
+    """
+    Parse a date string and return ISO format string, or None if parsing fails
+    """
+    parsed = parse_earned_date(date_string) if date_string else None
+    return parsed.isoformat() if parsed else None
 
 def sanitize_text(text: str, max_length: int = 255) -> str:
     """
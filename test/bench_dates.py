@@ -0,0 +1,53 @@
+"""
+Benchmark badge earned-date parsing: dateparser vs the format-specific fast path,
+with and without the memo cache. Uses the raw dates from data/leaderboard_detailed.csv.
+
+Usage: python test/bench_dates.py [iterations]
+"""
+import sys
+import csv
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import dateparser
+from scrapper.utils import parse_earned_date, _parse_known_format
+
+DETAILED_CSV = Path(__file__).parent.parent / "data" / "leaderboard_detailed.csv"
+
+def load_raw_dates():
+    with open(DETAILED_CSV, 'r', encoding='utf-8') as f:
+        return [row["earned_date_raw"] for row in csv.DictReader(f) if row.get("earned_date_raw")]
+
+def per_badge_us(fn, dates, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for d in dates:
+            fn(d)
+    return (time.perf_counter() - start) / (iterations * len(dates)) * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    dates = load_raw_dates()
+    print(f"Loaded {len(dates)} badge dates ({len(set(dates))} distinct)\n")
+
+    mismatches = [d for d in set(dates) if dateparser.parse(d).isoformat() != parse_earned_date(d).isoformat()]
+    for d in mismatches:
+        print(f"  ✗ '{d}': dateparser={dateparser.parse(d)} fast={parse_earned_date(d)}")
+    print(f"{'✓' if not mismatches else '✗'} Fast path matches dateparser on all distinct dates\n")
+
+    results = [
+        ("dateparser.parse", per_badge_us(dateparser.parse, dates, 1)),
+        ("fast path (uncached)", per_badge_us(_parse_known_format, dates, iterations)),
+    ]
+    parse_earned_date.cache_clear()
+    results.append(("parse_earned_date (memo)", per_badge_us(parse_earned_date, dates, iterations)))
+
+    baseline = results[0][1]
+    for name, cost in results:
+        print(f"  {name:<26} {cost:10.2f} µs/badge  ({baseline / cost:8.1f}x)")
+
+    return 0 if not mismatches else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark for fetching vs parsing: serves the profile fixtures from a local HTTP server
+and scrapes them with parsing in the fetch threads and in a process pool. Checks both
+give the same badges, then prints wall time and the fetch/parse stage timings.
+
+Usage: python test/bench_parse_pool.py [profiles] [parse workers] [backend]
+  backend: bs4 forces the BeautifulSoup cascade, the CPU-heavy case (default: configured)
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Local server: no rate limit, no retries, no browser
+os.environ.setdefault("REQUESTS_PER_SECOND", "0")
+os.environ.setdefault("USE_PLAYWRIGHT_FALLBACK", "false")
+if len(sys.argv) > 3:
+    os.environ["PARSER_BACKEND"] = sys.argv[3]
+
+from scrapper import scrapper
+
+logging.disable(logging.INFO)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def serve(pages):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages[int(self.path.rsplit("/", 1)[-1]) % len(pages)]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def scrape(participants, parse_workers):
+    start = time.perf_counter()
+    results = [None] * len(participants)
+    for i, result in scrapper.iter_profile_badges(participants, parse_workers=parse_workers):
+        results[i] = result
+    return results, time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parse_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    pages = [p.read_bytes() for p in sorted(FIXTURES_DIR.glob("profile_*.html"))]
+    if not pages:
+        print(f"❌ No fixtures found in {FIXTURES_DIR}")
+        return 1
+
+    server = serve(pages)
+    participants = [
+        {"name": f"P{i}", "email": f"p{i}@example.com", "profile_url": f"http://127.0.0.1:{server.server_port}/p/{i}"}
+        for i in range(count)
+    ]
+
+    print("=" * 60)
+    print(f"Scraping {count} profiles, {scrapper.MAX_WORKERS} fetch threads, parser {scrapper.PARSER_BACKEND}")
+    print("=" * 60)
+    inline, inline_time = scrape(participants, 0)
+    print(f"  parse in fetch threads    {inline_time:6.2f}s  ({scrapper.timing_summary()})")
+    pooled, pooled_time = scrape(participants, parse_workers)
+    print(f"  parse in {parse_workers} processes     {pooled_time:6.2f}s  ({scrapper.timing_summary()})")
+    server.shutdown()
+
+    same = inline == pooled
+    print(f"\n  {'✓' if same else '✗'} Same badges for all {count} profiles")
+    return 0 if same else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for the badge parser backends over saved profile HTML fixtures.
+Checks that every backend extracts the same records, then times each one.
+
+Usage: python test/bench_parser.py [iterations]
+"""
+import sys
+import time
+import logging
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+from scrapper.scrapper import parse_badges_from_soup
+from scrapper.badge_parser import parse_badges_fast, resolve_backend
+
+logging.disable(logging.INFO)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+def parse_bs4(html):
+    return parse_badges_from_soup(BeautifulSoup(html, "html.parser"))
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    fixtures = {p.name: p.read_text(encoding="utf-8") for p in sorted(FIXTURES_DIR.glob("profile_*.html"))}
+    if not fixtures:
+        print(f"❌ No fixtures found in {FIXTURES_DIR}")
+        return 1
+
+    backends = {"bs4 (html.parser)": parse_bs4}
+    for name in ("selectolax", "lxml"):
+        if resolve_backend(name) == name:
+            backends[name] = lambda html, name=name: parse_badges_fast(html, name)
+        else:
+            print(f"⚠ {name} not installed, skipping")
+
+    print("=" * 60)
+    print("Checking backends agree")
+    print("=" * 60)
+    ok = True
+    for fixture, html in fixtures.items():
+        expected = parse_bs4(html)
+        for name, parse in backends.items():
+            same = parse(html) == expected
+            ok = ok and same
+            print(f"  {'✓' if same else '✗'} {fixture}: {name} ({len(expected)} badges)")
+
+    print("\n" + "=" * 60)
+    print(f"Timing ({iterations} iterations x {len(fixtures)} fixtures)")
+    print("=" * 60)
+    baseline = None
+    for name, parse in backends.items():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for html in fixtures.values():
+                parse(html)
+        per_profile = (time.perf_counter() - start) / (iterations * len(fixtures)) * 1000
+        baseline = baseline or per_profile
+        print(f"  {name:<20} {per_profile:8.3f} ms/profile  ({baseline / per_profile:5.1f}x)")
+
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
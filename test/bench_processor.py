@@ -0,0 +1,58 @@
+"""
+Benchmark processor.build_and_save_csvs and compute_summary on synthetic results
+at 1k/10k/100k participants (about 8 badges each, mixed UTC offsets, some undated).
+
+Usage: python test/bench_processor.py [sizes...]
+"""
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapper.processor import build_and_save_csvs, compute_summary, flatten_results, MAX_BADGES
+
+OFFSETS = ["-04:00", "-05:00", "-07:00", "+00:00", "+05:30"]
+
+def synthetic_results(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    results = []
+    for i in range(n):
+        badges = []
+        for j in range(rnd.randint(0, MAX_BADGES + 2)):
+            dated = rnd.random() > 0.05
+            badges.append({
+                "badge_name": f"Badge {j}",
+                "earned_date_raw": "Oct 22, 2025 EDT",
+                "earned_date": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00{rnd.choice(OFFSETS)}" if dated else None,
+            })
+        results.append({
+            "name": f"Participant {i}",
+            "email": f"p{i}@example.com",
+            "profile_url": f"https://www.cloudskillsboost.google/public_profiles/{i:08d}",
+            "badges": badges,
+            "error": None,
+        })
+    return results
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'participants':>12} {'badges':>9} {'flatten':>9} {'csvs':>9} {'summary':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            results = synthetic_results(n)
+            badges = sum(min(len(r["badges"]), MAX_BADGES) for r in results)
+            flatten = timed(flatten_results, results, MAX_BADGES)
+            csvs = timed(build_and_save_csvs, results, Path(tmp))
+            summary = timed(compute_summary, results)
+            print(f"{n:>12,} {badges:>9,} {flatten:>8.2f}s {csvs:>8.2f}s {summary:>8.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Checks that a profile that couldn't be fetched is never pushed: a failed result
+(error set, no badges) must not count as a change for the fingerprints, nor be
+written to Supabase by the streaming sink.
+
+Usage: python test/test_failed_fetch.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapper.fingerprints import FingerprintStore
+from scrapper.pipeline import SupabaseBatchSink
+
+URL = "https://www.cloudskillsboost.google/public_profiles/failed-fetch"
+OK = {
+    "name": "Test", "email": "test@example.com", "profile_url": URL,
+    "badges": [{"badge_name": "Badge", "earned_date": "2025-01-02T00:00:00+00:00", "earned_date_raw": "Jan 2, 2025"}],
+    "error": None
+}
+FAILED = {**OK, "badges": [], "error": "fetch failed: HTTP 503"}
+
+class RecordingClient:
+    """
+    Stands in for SupabaseClient, remembering what would have been pushed
+    """
+
+    def __init__(self):
+        self.pushed = []
+        self.last_badge_sync = {}
+
+    def upsert_participants_and_badges(self, results, update_ranks=True):
+        self.pushed.extend(results)
+        return len(results), 0
+
+    def update_ranks(self):
+        pass
+
+def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        fingerprints = FingerprintStore.from_data_dir(Path(tmp))
+        fingerprints.update([OK])
+
+        changed = fingerprints.changed([FAILED])
+        print(f"  {'✓' if not changed else '✗'} Failed fetch is not a change for the fingerprints")
+        ok &= not changed
+
+        for store in (None, fingerprints):
+            client = RecordingClient()
+            sink = SupabaseBatchSink(client, batch_size=1, fingerprints=store)
+            sink.write(FAILED)
+            sink.close()
+            mode = "incremental" if store else "full"
+            print(f"  {'✓' if not client.pushed else '✗'} Failed fetch is not pushed by the streaming sink ({mode})")
+            ok &= not client.pushed
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from scrapper.scrapper import scrape_profile_badges
+from scrapper.scrapper import scrape_profile_badges, FetchError
 import logging
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -17,7 +17,12 @@ print("=" * 60)
 print(f"Testing badge scraping for: {test_url}")
 print("=" * 60)
 
-badges = scrape_profile_badges(test_url)
+try:
+    badges = scrape_profile_badges(test_url)
+except FetchError as e:
+    print(f"\n❌ Could not fetch the profile: {e}")
+    print("\nTip: Check the URL is a public profile and that the site is reachable.")
+    sys.exit(1)
 
 print(f"\n✅ Found {len(badges)} badge(s):\n")
 for i, badge in enumerate(badges, 1):